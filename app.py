@@ -1,12 +1,23 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from geopy.geocoders import Nominatim
-from datetime import datetime, timedelta
 import threading
+import asyncio
+import heapq
 import math
+import time
 import json
 import os
+import re
+import unicodedata
+import atexit
+import importlib.util
+import shelve
+from collections import OrderedDict
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Built-in van capacity dataset previously stored in van_capacity.json
 VAN_CAPACITY_DATA = [
@@ -14,12 +25,151 @@ VAN_CAPACITY_DATA = [
     {"make": "Mercedes", "model": "Sprinter", "capacity": 13.5},
     {"make": "Volkswagen", "model": "Crafter", "capacity": 14.0},
 ]
+VAN_CAPACITY_INDEX = {(e["make"].lower(), e["model"].lower()): e["capacity"] for e in VAN_CAPACITY_DATA}
+
+# On-disk cache of Nominatim results, keyed by normalized address
+GEOCODE_CACHE_PATH = "geocache.db"
+
+# Street-type spellings folded together for geocode cache keys
+ADDRESS_ABBREVIATIONS = {
+    "street": "st", "road": "rd", "avenue": "ave", "drive": "dr",
+    "lane": "ln", "court": "ct", "place": "pl", "boulevard": "blvd",
+    "crescent": "cres", "close": "cl", "terrace": "ter", "square": "sq",
+    "north": "n", "south": "s", "east": "e", "west": "w",
+}
+_ADDRESS_PUNCT = re.compile(r"[.,#]")
+_ADDRESS_SPACE = re.compile(r"\s+")
+
+# Weather readings are reused for 30 minutes, LRU-capped
+WEATHER_TTL = 1800
+WEATHER_CACHE_SIZE = 512
+
+# (connect, read) timeout for weather and routing requests
+HTTP_TIMEOUT = (2, 8)
+
+# Stop columns grow in chunks of this many rows
+STOP_CHUNK = 64
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_matrix(lats, lons):
+    # All-pairs great-circle distances in km, one broadcast pass instead of a Python double loop
+    lats = np.radians(np.asarray(lats, dtype=np.float64))
+    lons = np.radians(np.asarray(lons, dtype=np.float64))
+    dlat = lats[:, None] - lats[None, :]
+    dlon = lons[:, None] - lons[None, :]
+    cos_lat = np.cos(lats)
+    a = np.sin(dlat / 2) ** 2 + cos_lat[:, None] * cos_lat[None, :] * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def response_json(resp):
+    # Non-200 bodies are error pages, not data
+    if resp.status_code != 200:
+        return None
+    if orjson is not None:
+        return orjson.loads(resp.content)
+    return resp.json()
+
+
+def normalize_address(address):
+    # "10 Main St." and " 10 main street " share one cache entry
+    text = unicodedata.normalize("NFKD", address).encode("ascii", "ignore").decode("ascii")
+    text = _ADDRESS_PUNCT.sub(" ", text.lower())
+    words = _ADDRESS_SPACE.split(text.strip())
+    return " ".join(ADDRESS_ABBREVIATIONS.get(w, w) for w in words)
+
+
+def format_coords(lat, lon):
+    return f"{lat:.5f},{lon:.5f}" if lat is not None else "N/A"
+
+
+def nearest_neighbor_tour(dist):
+    # Greedy open tour starting at the first stop
+    n = len(dist)
+    visited = np.zeros(n, dtype=bool)
+    visited[0] = True
+    tour = [0]
+    for _ in range(n - 1):
+        nxt = int(np.where(visited, np.inf, dist[tour[-1]]).argmin())
+        visited[nxt] = True
+        tour.append(nxt)
+    return tour
+
+
+def _two_opt_kernel(tour, dist):
+    # Array form of two_opt for Numba: reverses in place on an int64 permutation
+    n = tour.shape[0]
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, n - 1):
+            for k in range(i + 1, n):
+                a, b, c = tour[i - 1], tour[i], tour[k]
+                delta = dist[a, c] - dist[a, b]
+                if k + 1 < n:
+                    d = tour[k + 1]
+                    delta += dist[b, d] - dist[c, d]
+                if delta < -1e-9:
+                    lo, hi = i, k
+                    while lo < hi:
+                        tour[lo], tour[hi] = tour[hi], tour[lo]
+                        lo += 1
+                        hi -= 1
+                    improved = True
+    return tour
+
+
+# Compile the 2-opt kernel when Numba is installed; the list version below is faster than uncompiled array code
+try:
+    from numba import njit
+    _two_opt_kernel = njit(cache=True, fastmath=True)(_two_opt_kernel)
+except ImportError:
+    njit = None
+
+
+def two_opt(tour, dist):
+    # Reverse segments while that shortens the path; the first stop stays fixed, the end is free
+    if njit is not None:
+        route = np.asarray(tour, dtype=np.int64)
+        return _two_opt_kernel(route, np.ascontiguousarray(dist, dtype=np.float64)).tolist()
+    tour = list(tour)
+    n = len(tour)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, n - 1):
+            for k in range(i + 1, n):
+                a, b, c = tour[i - 1], tour[i], tour[k]
+                delta = dist[a, c] - dist[a, b]
+                if k + 1 < n:
+                    d = tour[k + 1]
+                    delta += dist[b, d] - dist[c, d]
+                if delta < -1e-9:
+                    tour[i:k + 1] = tour[i:k + 1][::-1]
+                    improved = True
+    return tour
+
 
 try:
     from tkintermapview import TkinterMapView
 except ImportError:
     TkinterMapView = None
 
+# Concurrent geocoding needs aiohttp; fall back to one thread per stop without it
+if importlib.util.find_spec("aiohttp") is not None:
+    from geopy.adapters import AioHTTPAdapter
+    from geopy.extra.rate_limiter import AsyncRateLimiter
+else:
+    AioHTTPAdapter = None
+
+# Faster JSON decoding for API responses when available
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Placeholder for mapping - Folium or similar could be integrated with a web widget
 try:
     import folium
@@ -33,13 +183,34 @@ class StopDropApp(tk.Tk):
         self.geometry('1100x700')
         self.configure(bg='#1e1e2f')
         self.iconbitmap('')  # You can set your custom icon here
-        self.stops = []
+        self._stops_by_id = {}
+        self._reset_stop_columns()
+        self._progress_pending = False
+        self._last_progress = None
+        self._last_pct = None
+        self._alerts = []
+        self._alert_job = None
+        self._map_window = None
+        self._routing = False
         self.progress = 0
         self.total_capacity = 0
-        self.used_capacity = 0
-        self.weather_cache = {}
+        self.weather_cache = OrderedDict()
+        self._weather_lock = threading.Lock()
+        # Shared keep-alive session for weather and routing APIs
+        self._http = requests.Session()
+        self._http.headers['User-Agent'] = 'stopdrop_app'
+        # Transient gateway errors (common on the public OSRM server) are retried with backoff
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504), allowed_methods=frozenset(['GET']))
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
+        self._http.mount('http://', adapter)
+        self._http.mount('https://', adapter)
+        self._geo_cache = None
+        self._geo_lock = threading.Lock()
         self.create_widgets()
         self.geolocator = Nominatim(user_agent="stopdrop_app")
+        self._loop = None
+        if AioHTTPAdapter is not None:
+            self._start_geocode_loop()
         self.stop_counter = 1
 
     def create_widgets(self):
@@ -136,87 +307,219 @@ class StopDropApp(tk.Tk):
             if self.used_capacity + load > self.total_capacity > 0:
                 messagebox.showwarning('Capacity full', 'Van capacity will be exceeded!')
                 return
-            # Geocode address (can be slow, so run in thread)
-            def fetch_coords():
-                try:
-                    location = self.geolocator.geocode(address)
-                    if not location:
-                        raise Exception('Address not found')
-                    coords = f"{location.latitude:.5f},{location.longitude:.5f}"
-                    if est_time is None and self.stops:
-                        last = self.stops[-1]
-                        if last['coords'] != 'N/A':
-                            lat, lon = map(float, last['coords'].split(','))
-                            est = self.fetch_travel_time((lat, lon), (location.latitude, location.longitude))
-                            est_time_local = int(max(est, 1))
-                        else:
-                            est_time_local = 0
-                        self.time_entry.delete(0, tk.END)
-                        self.time_entry.insert(0, str(est_time_local))
-                    else:
-                        est_time_local = est_time if est_time is not None else 0
-                    weather = self.fetch_weather(location.latitude, location.longitude)
-                except Exception as e:
-                    coords = "N/A"
-                    est_time_local = est_time if est_time is not None else 0
-                    weather = None
-                self.tree.insert("", 'end', values=(self.stop_counter, address, f"{est_time_local} min", f"{load} m³", coords))
-                self.stops.append({'stop': self.stop_counter, 'address': address, 'est_time': est_time_local, 'load': load, 'coords': coords, 'weather': weather, 'completed': False})
-                self.stop_counter += 1
-                self.used_capacity += load
-                self.update_progress()
-            threading.Thread(target=fetch_coords).start()
+            # Travel time is measured from the last stop as of now; the worker never reads _stops_by_id
+            last = next(reversed(self._stops_by_id.values()), None)
+            prev = (last['lat'], last['lon']) if last is not None and last['lat'] is not None else None
+            # Geocode address (can be slow, so run off the Tk thread)
+            if self._loop is not None:
+                asyncio.run_coroutine_threadsafe(self._geocode_async(address, est_time, load, prev), self._loop)
+            else:
+                threading.Thread(target=self._geocode_sync, args=(address, est_time, load, prev)).start()
         except ValueError:
             messagebox.showerror('Input error', 'Estimated time and Load must be positive numbers.')
 
+    def _geocode_sync(self, address, est_time, load, prev):
+        try:
+            location = self._cached_geocode(address)
+        except Exception:
+            location = None
+        self._finish_stop(address, est_time, load, prev, location)
+
+    async def _geocode_async(self, address, est_time, load, prev):
+        key = normalize_address(address)
+        # shelve reads and writes block, so they run on the executor and other lookups keep going
+        location = await self._loop.run_in_executor(None, self._geo_cache_get, key)
+        if location is None:
+            try:
+                found = await self._async_geocode(address)
+            except Exception:
+                found = None
+            if found:
+                location = (found.latitude, found.longitude, found.address)
+                await self._loop.run_in_executor(None, self._geo_cache_put, key, location)
+        # Travel time and weather still use blocking requests, keep them off the loop
+        await self._loop.run_in_executor(None, self._finish_stop, address, est_time, load, prev, location)
+
+    def _finish_stop(self, address, est_time, load, prev, location):
+        # prev is the (lat, lon) of the previous stop, None when there is none or it has no coordinates
+        try:
+            if not location:
+                raise Exception('Address not found')
+            lat, lon, _ = location
+            if est_time is None and prev is not None:
+                est = self.fetch_travel_time(prev, (lat, lon))
+                est_time_local = int(max(est, 1))
+            else:
+                est_time_local = est_time if est_time is not None else 0
+            weather = self.fetch_weather(lat, lon)
+        except Exception:
+            lat = lon = None
+            est_time_local = est_time if est_time is not None else 0
+            weather = None
+        self.after(0, self._insert_stop, address, est_time is None, est_time_local, load, lat, lon, weather)
+
+    def _insert_stop(self, address, auto_time, est_time, load, lat, lon, weather):
+        if auto_time and self._stops_by_id:
+            self.time_entry.delete(0, tk.END)
+            self.time_entry.insert(0, str(est_time))
+        stop_id = self.stop_counter
+        self.tree.insert("", 'end', iid=str(stop_id), values=(stop_id, address, f"{est_time} min", f"{load} m³", format_coords(lat, lon)))
+        self._stops_by_id[stop_id] = {'stop': stop_id, 'address': address, 'lat': lat, 'lon': lon, 'weather': weather, 'row': self._n}
+        self._append_stop_row(load, est_time, lat, lon)
+        self.stop_counter += 1
+        self._total_stops += 1
+        self.used_capacity += load
+        self._schedule_progress()
+
+    def _reset_stop_columns(self):
+        # Numeric stop fields live in parallel arrays (indexed by stop['row']) for vectorized totals
+        self._n = 0
+        self._loads = np.zeros(STOP_CHUNK, dtype=np.float32)
+        self._est_times = np.zeros(STOP_CHUNK, dtype=np.int32)
+        self._completed = np.zeros(STOP_CHUNK, dtype=bool)
+        # Coordinates as columns too (NaN when geocoding failed) so routing slices them directly
+        self._lats = np.full(STOP_CHUNK, np.nan)
+        self._lons = np.full(STOP_CHUNK, np.nan)
+        # Running totals so update_progress never has to scan the stops
+        self._total_stops = 0
+        self._done_stops = 0
+        self.used_capacity = 0
+
+    def _append_stop_row(self, load, est_time, lat, lon):
+        if self._n == len(self._loads):
+            size = self._n + STOP_CHUNK
+            self._loads = np.resize(self._loads, size)
+            self._est_times = np.resize(self._est_times, size)
+            self._completed = np.resize(self._completed, size)
+            self._lats = np.resize(self._lats, size)
+            self._lons = np.resize(self._lons, size)
+        self._loads[self._n] = load
+        self._est_times[self._n] = est_time
+        self._completed[self._n] = False
+        self._lats[self._n] = np.nan if lat is None else lat
+        self._lons[self._n] = np.nan if lon is None else lon
+        self._n += 1
+
     def remove_selected(self):
         selected = self.tree.selection()
         if not selected:
             return
-        for item in selected:
-            idx = int(self.tree.item(item, 'values')[0]) - 1
-            stop = self.stops[idx]
-            if stop['completed']:
+        removed = []
+        for iid in selected:
+            row = self._stops_by_id[int(iid)]['row']
+            if self._completed[row]:
                 continue
-            self.used_capacity -= stop['load']
-            self.stops[idx]['load'] = 0
-            self.tree.delete(item)
-        self.update_progress()
+            del self._stops_by_id[int(iid)]
+            # Rows are never reused, so a removed stop just stops contributing load
+            self.used_capacity -= float(self._loads[row])
+            self._loads[row] = 0
+            self._total_stops -= 1
+            removed.append(iid)
+        # One Tcl call so the tree re-lays out once, not per row
+        self.tree.delete(*removed)
+        self._schedule_progress()
 
     def clear_all(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        self.stops = []
+        self.tree.delete(*self.tree.get_children())
+        self._stops_by_id = {}
+        self._reset_stop_columns()
         self.stop_counter = 1
-        self.used_capacity = 0
-        self.update_progress()
+        self._schedule_progress()
+
+    def _schedule_progress(self):
+        # Collapse bursts of updates (e.g. many geocodes finishing together) into one redraw
+        if not self._progress_pending:
+            self._progress_pending = True
+            self.after_idle(self.update_progress)
 
     def update_progress(self):
-        total = len(self.stops)
-        done = sum(1 for s in self.stops if s['completed'])
+        self._progress_pending = False
+        total = self._total_stops
+        done = self._done_stops
+        state = (done, total, self.used_capacity, self.total_capacity)
+        if state == self._last_progress:
+            return
+        self._last_progress = state
         pct = 100 * done / total if total > 0 else 0
-        self.progress_var.set(pct)
-        self.progress_label.config(text=f'Progress: {pct:.1f}%')
+        if pct != self._last_pct:
+            self._last_pct = pct
+            self.progress_var.set(pct)
+            self.progress_label['text'] = f'Progress: {pct:.1f}%'
         # Map update - in real app, update map widget
-        self.map_label.config(text=f"Stops completed: {done}/{total}\nProgress: {pct:.1f}%\n(Van Load: {self.used_capacity:.2f}/{self.total_capacity:.2f} m³)")
+        self.map_label['text'] = f"Stops completed: {done}/{total}\nProgress: {pct:.1f}%\n(Van Load: {self.used_capacity:.2f}/{self.total_capacity:.2f} m³)"
+
+    def _open_geo_cache(self):
+        if self._geo_cache is None:
+            self._geo_cache = shelve.open(GEOCODE_CACHE_PATH)
+            atexit.register(self._geo_cache.close)
+        return self._geo_cache
+
+    def _geo_cache_get(self, key):
+        with self._geo_lock:
+            return self._open_geo_cache().get(key)
+
+    def _geo_cache_put(self, key, location):
+        with self._geo_lock:
+            self._open_geo_cache()[key] = location
+
+    def _cached_geocode(self, address):
+        key = normalize_address(address)
+        hit = self._geo_cache_get(key)
+        if hit is not None:
+            return hit
+        location = self.geolocator.geocode(address)
+        if not location:
+            return None
+        hit = (location.latitude, location.longitude, location.address)
+        self._geo_cache_put(key, hit)
+        return hit
+
+    def _start_geocode_loop(self):
+        # One event loop thread runs all geocodes concurrently on a pooled aiohttp session
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+
+        async def make_geocoder():
+            geolocator = Nominatim(user_agent="stopdrop_app", adapter_factory=AioHTTPAdapter)
+            await geolocator.__aenter__()
+            return geolocator
+
+        self._async_geolocator = asyncio.run_coroutine_threadsafe(make_geocoder(), self._loop).result()
+        atexit.register(self._stop_geocode_loop)
+        # Nominatim usage policy allows at most one request per second
+        self._async_geocode = AsyncRateLimiter(self._async_geolocator.geocode, min_delay_seconds=1.0)
+
+    def _stop_geocode_loop(self):
+        # Close the aiohttp session opened in make_geocoder, then let the loop thread finish
+        if not self._loop.is_running():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._async_geolocator.__aexit__(None, None, None), self._loop).result(timeout=5)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
 
     def fetch_van_capacity(self, make, model):
-        for entry in VAN_CAPACITY_DATA:
-            if entry["make"].lower() == make.lower() and entry["model"].lower() == model.lower():
-                return entry["capacity"]
-        return None
+        return VAN_CAPACITY_INDEX.get((make.lower(), model.lower()))
 
     def fetch_weather(self, lat, lon):
-        cache_key = f"{lat},{lon}"
-        if cache_key in self.weather_cache:
-            return self.weather_cache[cache_key]
+        # ~1 km grid cell, so neighbouring stops share one lookup
+        cache_key = (round(lat, 2), round(lon, 2))
+        with self._weather_lock:
+            hit = self.weather_cache.get(cache_key)
+            if hit is not None and time.monotonic() - hit[1] < WEATHER_TTL:
+                self.weather_cache.move_to_end(cache_key)
+                return hit[0]
         url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&current_weather=true"
         try:
-            resp = requests.get(url, timeout=10)
-            data = resp.json()
+            resp = self._http.get(url, timeout=HTTP_TIMEOUT)
+            data = response_json(resp) or {}
             temp = data.get("current_weather", {}).get("temperature")
             if temp is not None:
-                self.weather_cache[cache_key] = temp
+                with self._weather_lock:
+                    self.weather_cache[cache_key] = (temp, time.monotonic())
+                    self.weather_cache.move_to_end(cache_key)
+                    if len(self.weather_cache) > WEATHER_CACHE_SIZE:
+                        self.weather_cache.popitem(last=False)
             return temp
         except Exception:
             return None
@@ -230,8 +533,8 @@ class StopDropApp(tk.Tk):
                 "key": api_key,
             }
             try:
-                resp = requests.get("https://maps.googleapis.com/maps/api/directions/json", params=params, timeout=10)
-                data = resp.json()
+                resp = self._http.get("https://maps.googleapis.com/maps/api/directions/json", params=params, timeout=HTTP_TIMEOUT)
+                data = response_json(resp) or {}
                 if data.get("routes"):
                     dur = data["routes"][0]["legs"][0]["duration"]["value"] / 60
                     return dur
@@ -240,12 +543,148 @@ class StopDropApp(tk.Tk):
         # fallback to OSRM
         url = f"http://router.project-osrm.org/route/v1/driving/{start[1]},{start[0]};{end[1]},{end[0]}?overview=false"
         try:
-            resp = requests.get(url, timeout=10)
-            data = resp.json()
+            resp = self._http.get(url, timeout=HTTP_TIMEOUT)
+            data = response_json(resp) or {}
             return data["routes"][0]["duration"] / 60
         except Exception:
             return 0
 
+    def _fetch_osrm_table(self, coords):
+        # Full N x N driving-time matrix (minutes) from one OSRM /table request
+        locs = ";".join(f"{lon},{lat}" for lat, lon in coords)
+        url = f"http://router.project-osrm.org/table/v1/driving/{locs}?annotations=duration"
+        try:
+            resp = self._http.get(url, timeout=HTTP_TIMEOUT)
+            data = response_json(resp) or {}
+            rows = [[np.inf if v is None else v for v in row] for row in data["durations"]]
+            return np.array(rows, dtype=np.float32) / 60
+        except Exception:
+            return None
+
+    def _placed_stops(self):
+        # Only geocoded stops can be placed; returns their ids alongside their coordinates
+        rows = np.fromiter((stop['row'] for stop in self._stops_by_id.values()), dtype=np.intp, count=len(self._stops_by_id))
+        lats = self._lats[rows]
+        lons = self._lons[rows]
+        placed = ~np.isnan(lats)
+        ids = [stop_id for stop_id, keep in zip(self._stops_by_id, placed) if keep]
+        return ids, lats[placed], lons[placed]
+
+    def _route_costs(self, lats, lons):
+        # Symmetric cost matrix: OSRM driving times when the table request succeeds, else great-circle km
+        durations = self._fetch_osrm_table(list(zip(lats, lons))) if len(lats) > 2 else None
+        if durations is not None and np.isfinite(durations).all():
+            # 2-opt assumes symmetric costs, so average the two driving directions
+            return (durations + durations.T) / 2
+        return haversine_matrix(lats, lons)
+
+    def _plan_route(self, ids, lats, lons):
+        # Runs on a worker thread: the OSRM request and 2-opt never block the Tk loop
+        order = ids
+        try:
+            if len(ids) >= 3:
+                dist = self._route_costs(lats, lons)
+                if len(ids) == 3:
+                    # With the first stop fixed there are only two orders; the 1-2 leg is shared
+                    tour = [0, 1, 2] if dist[0, 1] <= dist[0, 2] else [0, 2, 1]
+                else:
+                    tour = two_opt(nearest_neighbor_tour(dist), dist)
+                order = [ids[i] for i in tour]
+        except Exception:
+            pass
+        self.after(0, self._begin_route, order)
+
+    def _apply_route_order(self, order):
+        # Stops removed while planning are dropped; unplaced and newly added stops keep their relative order at the end
+        order = [stop_id for stop_id in order if stop_id in self._stops_by_id]
+        placed = set(order)
+        order += [stop_id for stop_id in self._stops_by_id if stop_id not in placed]
+        if order == list(self._stops_by_id):
+            return
+        self._stops_by_id = {stop_id: self._stops_by_id[stop_id] for stop_id in order}
+        self._refresh_tree()
+
+    def _refresh_tree(self):
+        # Hide the tree while it is rebuilt so Tk lays it out once at the end
+        self.tree.grid_remove()
+        self.tree.delete(*self.tree.get_children())
+        for pos, (stop_id, stop) in enumerate(self._stops_by_id.items(), 1):
+            stop['stop'] = pos
+            row = stop['row']
+            self.tree.insert("", 'end', iid=str(stop_id), values=(pos, stop['address'], f"{self._est_times[row]} min", f"{self._loads[row]} m³", format_coords(stop['lat'], stop['lon'])))
+        self.tree.grid()
+
+    def start_route(self):
+        if not self._stops_by_id:
+            messagebox.showinfo('No stops', 'Add at least one stop to start route.')
+            return
+        if self._routing:
+            return
+        self._routing = True
+        threading.Thread(target=self._plan_route, args=self._placed_stops(), daemon=True).start()
+
+    def _begin_route(self, order):
+        self._routing = False
+        self._apply_route_order(order)
+        if not self._stops_by_id:
+            return
+        stops = list(self._stops_by_id.values())
+        # Reuse the open map window so only the changed markers are redrawn
+        if self._map_window is not None and self._map_window.winfo_exists():
+            self._map_window.show_route(stops)
+            self._map_window.lift()
+        else:
+            self._map_window = MapWindow(self, stops)
+
+        self._schedule_alerts(stops)
+        self._advance_route(list(self._stops_by_id), 0)
+
+    def _schedule_alerts(self, stops):
+        # One heap of reminder deadlines; only the earliest is armed with after() at any time
+        if self._alert_job is not None:
+            self.after_cancel(self._alert_job)
+        now = time.time()
+        elapsed = 0
+        self._alerts = []
+        for stop in stops:
+            elapsed += int(self._est_times[stop['row']])
+            fire_at = now + (elapsed - 5) * 60
+            if fire_at > now:
+                heapq.heappush(self._alerts, (fire_at, stop['stop'], stop['address']))
+        self._arm_next_alert()
+
+    def _arm_next_alert(self):
+        if self._alerts:
+            delay_ms = max(0, int((self._alerts[0][0] - time.time()) * 1000))
+            self._alert_job = self.after(delay_ms, self._fire_next_alert)
+        else:
+            self._alert_job = None
+
+    def _fire_next_alert(self):
+        _, _, address = heapq.heappop(self._alerts)
+        self._arm_next_alert()
+        messagebox.showinfo('Reminder', f"Delivery for {address} soon")
+
+    def _advance_route(self, route, pos):
+        # Route simulation runs on the Tk loop: one confirmation per call, then re-arm via after()
+        while pos < len(route):
+            stop = self._stops_by_id.get(route[pos])
+            if stop is not None and not self._completed[stop['row']]:
+                break
+            pos += 1
+        if pos < len(route):
+            row = stop['row']
+            # Simulate user confirming arrival and drop
+            if messagebox.askyesno('Confirm', f"Arrived at stop {stop['stop']}? ({stop['address']})"):
+                self._completed[row] = True
+                self._done_stops += 1
+                self._schedule_progress()
+                # Simulated fast-forward: 10 ms per estimated minute
+                self.after(int(self._est_times[row]) * 10, self._advance_route, route, pos + 1)
+                return
+        messagebox.showinfo('Route completed', 'You have completed all stops!')
+        self.update_progress()
+
 class MapWindow(tk.Toplevel):
     def __init__(self, master, stops):
         super().__init__(master)
@@ -256,54 +695,39 @@ class MapWindow(tk.Toplevel):
             return
         self.map = TkinterMapView(self, width=780, height=560)
         self.map.pack(padx=10, pady=10)
-        for stop in stops:
-            if stop['coords'] != 'N/A':
-                lat, lon = map(float, stop['coords'].split(','))
-                text = f"{stop['stop']}: {stop['address']}"
-                if stop.get('weather') is not None:
-                    text += f"\nTemp: {stop['weather']}°C"
-                self.map.set_marker(lat, lon, text=text)
-        if stops and stops[0]['coords'] != 'N/A':
-            lat, lon = map(float, stops[0]['coords'].split(','))
-            self.map.set_position(lat, lon)
+        self._markers = {}
+        self._path = None
+        # Position first: set_position redraws every existing marker, so markers added after are drawn once
+        if stops and stops[0]['lat'] is not None:
+            self.map.set_position(stops[0]['lat'], stops[0]['lon'])
+        self.show_route(stops)
 
-    def start_route(self):
-        if not self.stops:
-            messagebox.showinfo('No stops', 'Add at least one stop to start route.')
+    def show_route(self, stops):
+        if TkinterMapView is None:
             return
-        MapWindow(self, self.stops)
-
-        def schedule_alerts():
-            now = datetime.now()
-            elapsed = 0
-            for stop in self.stops:
-                elapsed += stop['est_time']
-                alert_time = now + timedelta(minutes=elapsed - 5)
-                delay = (alert_time - datetime.now()).total_seconds()
-                if delay > 0:
-                    threading.Timer(delay, lambda s=stop: messagebox.showinfo('Reminder', f"Delivery for {s['address']} soon" )).start()
-
-        schedule_alerts()
-
-        def route_task():
-            for idx, stop in enumerate(self.stops):
-                # Simulate user confirming arrival and drop
-                if stop['completed']:
-                    continue
-                answer = messagebox.askyesno('Confirm', f"Arrived at stop {stop['stop']}? ({stop['address']})")
-                if not answer:
-                    break
-                self.stops[idx]['completed'] = True
-                self.update_progress()
-                # Simulate time spent
-                mins = stop['est_time']
-                self.after(100, lambda: None)
-                for _ in range(mins):
-                    self.update()
-                    self.after(10)  # Simulated fast-forward
-            messagebox.showinfo('Route completed', 'You have completed all stops!')
-            self.update_progress()
-        threading.Thread(target=route_task).start()
+        placed = [stop for stop in stops if stop['lat'] is not None]
+        # Markers are keyed by stop row and position, so only added or removed stops touch the canvas
+        markers = {}
+        for stop in placed:
+            text = f"{stop['stop']}: {stop['address']}"
+            if stop.get('weather') is not None:
+                text += f"\nTemp: {stop['weather']}°C"
+            key = (stop['row'], stop['lat'], stop['lon'])
+            marker = self._markers.pop(key, None)
+            if marker is None:
+                marker = self.map.set_marker(stop['lat'], stop['lon'], text=text)
+            elif marker.text != text:
+                marker.set_text(text)
+            markers[key] = marker
+        for marker in self._markers.values():
+            marker.delete()
+        self._markers = markers
+        # Whole route as a single canvas polyline, replaced rather than edited
+        if self._path is not None:
+            self._path.delete()
+            self._path = None
+        if len(placed) > 1:
+            self._path = self.map.set_path([(stop['lat'], stop['lon']) for stop in placed])
 
 if __name__ == '__main__':
     app = StopDropApp()
@@ -1,14 +1,104 @@
 import json
 import csv
+import heapq
+import io
+import itertools
+import operator
 import sqlite3
 from datetime import datetime, timedelta
 import os
+import string
+from collections import deque
+from collections.abc import Sized
+from concurrent.futures import ThreadPoolExecutor, wait
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 import threading
 import time
+import numpy as np
 
-@dataclass
+# Faster JSON encoding for reports and exports when available
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Write buffer for export files, so large exports flush in big chunks
+EXPORT_BUFFER_SIZE = 1 << 20
+
+# Pages copied per step of an online database backup; writers can commit between steps
+BACKUP_PAGES = 1024
+
+# Actions dominated by disk I/O; these run on the rule pool instead of inline
+IO_BOUND_ACTIONS = frozenset({'generate_report', 'backup_data'})
+
+# Upper bound in seconds on how long a rule pass waits for its pooled actions
+RULE_ACTION_TIMEOUT = 30.0
+
+# Rows pulled per fetchmany call when streaming stops out of the database
+FETCH_CHUNK_SIZE = 8192
+
+# Bound parameters per IN (...) statement, under SQLite's default variable limit
+SQL_IN_CHUNK = 900
+
+# Stop count from which rule conditions use the compiled short-circuit kernels
+JIT_MIN_STOPS = 1000
+
+# Most recent notifications kept in memory; older ones are dropped
+NOTIFICATION_HISTORY = 10_000
+
+# Sort weight per priority label; unknown labels weigh as Normal
+PRIORITY_WEIGHTS = {'Urgent': 4, 'High': 3, 'Normal': 2, 'Low': 1}
+
+def dump_json(data) -> bytes:
+    """Encode data as UTF-8 JSON with two-space indentation, via orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+@lru_cache(maxsize=4096)
+def parse_window_start(value: str) -> datetime:
+    """Parse a delivery window timestamp, reusing earlier parses of the same string"""
+    return datetime.fromisoformat(value)
+
+def next_trigger(after: datetime, at) -> datetime:
+    """First moment strictly after `after` whose time of day is `at`"""
+    due = datetime.combine(after.date(), at)
+    return due if due > after else due + timedelta(days=1)
+
+_TEMPLATE_CONVERSIONS = {'r': repr, 's': str, 'a': ascii}
+
+def compile_template(template: str) -> Callable[..., str]:
+    """Compile a str.format template into a keyword-only render function.
+    
+    The template is split once into literal text and (field, conversion, spec) parts,
+    so rendering does no placeholder scanning. Templates using positional fields,
+    attributes, indexes or nested specs fall back to str.format.
+    """
+    parts = []
+    for literal, field, spec, conversion in string.Formatter().parse(template):
+        if literal:
+            parts.append(literal)
+        if field is None:
+            continue
+        if not field.isidentifier() or '{' in spec:
+            return template.format
+        parts.append((field, _TEMPLATE_CONVERSIONS.get(conversion), spec))
+    
+    def render(**values):
+        out = []
+        for part in parts:
+            if part.__class__ is str:
+                out.append(part)
+                continue
+            field, convert, spec = part
+            value = values[field]
+            out.append(format(convert(value) if convert else value, spec))
+        return ''.join(out)
+    return render
+
+@dataclass(slots=True)
 class DeliveryStop:
     """Enhanced delivery stop data structure"""
     id: int
@@ -28,14 +118,103 @@ class DeliveryStop:
     created_at: str = None
     completed_at: Optional[str] = None
 
+# Status codes used by StopBatch; anything else is 0
+STATUS_CODES = {'pending': 1, 'completed': 2}
+
+def _sum_reaches(values, limit):
+    """Whether the running sum of values reaches limit, stopping as soon as it does"""
+    total = 0.0
+    for value in values:
+        total += value
+        if total >= limit:
+            return True
+    return False
+
+def _count_reaches(codes, code, minimum):
+    """Whether code occurs at least minimum times in codes, stopping as soon as it does"""
+    if minimum <= 0:
+        return True
+    count = 0
+    for value in codes:
+        if value == code:
+            count += 1
+            if count >= minimum:
+                return True
+    return False
+
+# The condition kernels are only worth calling when Numba compiles them; otherwise NumPy is used
+try:
+    from numba import njit
+    _sum_reaches = njit(cache=True)(_sum_reaches)
+    _count_reaches = njit(cache=True)(_count_reaches)
+except ImportError:
+    njit = None
+
+@dataclass
+class StopBatch:
+    """Column arrays of the numeric stop fields, built once per pass for vectorized totals"""
+    load_size: np.ndarray
+    estimated_time: np.ndarray
+    priority: np.ndarray  # PRIORITY_WEIGHTS value, 0 for unknown labels
+    status: np.ndarray  # STATUS_CODES value
+    
+    @classmethod
+    def from_stops(cls, stops: List[DeliveryStop]) -> 'StopBatch':
+        n = len(stops)
+        return cls(
+            load_size=np.fromiter((s.load_size for s in stops), dtype=np.float64, count=n),
+            estimated_time=np.fromiter((s.estimated_time for s in stops), dtype=np.int64, count=n),
+            priority=np.fromiter((PRIORITY_WEIGHTS.get(s.priority, 0) for s in stops), dtype=np.int8, count=n),
+            status=np.fromiter((STATUS_CODES.get(s.status, 0) for s in stops), dtype=np.int8, count=n)
+        )
+    
+    def priority_counts(self) -> np.ndarray:
+        """Stops per PRIORITY_WEIGHTS value, indexable by weight"""
+        return np.bincount(self.priority, minlength=5)
+
+@dataclass
+class StopStats:
+    """Counts and totals shared by every report generated from one set of stops"""
+    total: int
+    completed: int
+    pending: int
+    total_load: float
+    total_time: int
+    completed_time: int
+    long_deliveries: int  # stops estimated over 30 minutes
+    per_priority: Dict[str, int]
+    
+    @classmethod
+    def from_batch(cls, batch: StopBatch) -> 'StopStats':
+        status_counts = np.bincount(batch.status, minlength=3)
+        priority_counts = batch.priority_counts()
+        completed = batch.status == STATUS_CODES['completed']
+        return cls(
+            total=len(batch.status),
+            completed=int(status_counts[STATUS_CODES['completed']]),
+            pending=int(status_counts[STATUS_CODES['pending']]),
+            total_load=float(batch.load_size.sum()),
+            total_time=int(batch.estimated_time.sum()),
+            completed_time=int(batch.estimated_time[completed].sum()),
+            long_deliveries=int(np.count_nonzero(batch.estimated_time > 30)),
+            per_priority={label: int(priority_counts[weight]) for label, weight in PRIORITY_WEIGHTS.items()}
+        )
+    
+    @classmethod
+    def from_stops(cls, stops: List[DeliveryStop]) -> 'StopStats':
+        return cls.from_batch(StopBatch.from_stops(stops))
+
 class TaskAutomationEngine:
     """Advanced task automation engine for courier operations"""
     
     def __init__(self, db_path: str):
         self.db_path = db_path
         self.automation_rules = []
-        self.scheduled_tasks = []
-        self.notifications = []
+        self.scheduled_tasks = deque()
+        self.notifications = deque(maxlen=NOTIFICATION_HISTORY)
+        self._notification_ids = itertools.count(1)
+        self._notification_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='automation')
         
     def add_automation_rule(self, name: str, conditions: Dict, actions: Dict):
         """Add an automation rule"""
@@ -45,187 +224,284 @@ class TaskAutomationEngine:
             'conditions': conditions,
             'actions': actions,
             'active': True,
-            'created_at': datetime.now().isoformat()
+            'created_at': datetime.now().isoformat(),
+            # Parameters are resolved once here instead of on every check
+            'check': self._compile_condition(conditions),
+            'run': self._compile_action(actions),
+            'io_bound': actions.get('type') in IO_BOUND_ACTIONS
         }
         self.automation_rules.append(rule)
         return rule['id']
     
     def check_and_execute_rules(self, stops: List[DeliveryStop]):
         """Check conditions and execute automation rules"""
+        # Numeric columns and the clock are read once and shared by every rule in the pass
+        batch = StopBatch.from_stops(stops)
+        now = datetime.now()
+        snapshot = stats = None
+        futures = {}
         for rule in self.automation_rules:
             if not rule['active']:
                 continue
                 
-            if self._evaluate_conditions(rule['conditions'], stops):
-                self._execute_actions(rule['actions'], stops)
+            if not rule['check'](stops, batch, now):
+                continue
+            
+            if rule['io_bound']:
+                # Pooled actions read a copy, since inline actions may reorder stops,
+                # and share one set of report stats for the pass
+                if snapshot is None:
+                    snapshot = list(stops)
+                    stats = StopStats.from_batch(batch)
+                futures[self._pool.submit(rule['run'], snapshot, stats, now)] = rule['name']
+            else:
+                rule['run'](stops, None, now)
+        
+        if futures:
+            done, not_done = wait(futures, timeout=RULE_ACTION_TIMEOUT)
+            for future in done:
+                try:
+                    future.result()
+                except Exception as e:
+                    self._send_notification(f"Automation rule '{futures[future]}' failed: {str(e)}", now)
+            for future in not_done:
+                self._send_notification(f"Automation rule '{futures[future]}' timed out after {RULE_ACTION_TIMEOUT:g}s", now)
+    
+    def next_due_time(self, now: datetime) -> Optional[datetime]:
+        """Earliest upcoming trigger of the active time-based rules, None when there are none"""
+        due = [next_trigger(now, datetime.strptime(rule['conditions']['time'], '%H:%M').time())
+               for rule in self.automation_rules
+               if rule['active'] and rule['conditions'].get('type') == 'time_based']
+        return min(due, default=None)
     
-    def _evaluate_conditions(self, conditions: Dict, stops: List[DeliveryStop]) -> bool:
-        """Evaluate if conditions are met"""
+    def shutdown(self):
+        """Stop the rule pool once pending actions finish"""
+        self._pool.shutdown(wait=True)
+    
+    def _compile_condition(self, conditions: Dict) -> Callable[[List[DeliveryStop], StopBatch, datetime], bool]:
+        """Build a predicate over the stops, their StopBatch and the pass time for a condition definition"""
         condition_type = conditions.get('type')
         
         if condition_type == 'capacity_threshold':
-            total_load = sum(stop.load_size for stop in stops)
             max_capacity = conditions.get('max_capacity', 15.0)
             threshold = conditions.get('threshold_percent', 80) / 100
-            return total_load >= (max_capacity * threshold)
+            limit = max_capacity * threshold
+            def capacity_reached(stops, batch, now):
+                if njit is not None and len(batch.load_size) >= JIT_MIN_STOPS:
+                    return _sum_reaches(batch.load_size, limit)
+                return batch.load_size.sum() >= limit
+            return capacity_reached
             
         elif condition_type == 'time_based':
-            current_time = datetime.now().time()
             trigger_time = datetime.strptime(conditions.get('time'), '%H:%M').time()
-            return current_time >= trigger_time
+            last_check = None
+            def trigger_passed(stops, batch, now):
+                # Fires once each time the trigger time is crossed; the first check only sets the baseline,
+                # so crossings from before the engine started are not replayed
+                nonlocal last_check
+                previous, last_check = last_check, now
+                return previous is not None and next_trigger(previous, trigger_time) <= now
+            return trigger_passed
             
         elif condition_type == 'priority_urgent':
-            urgent_count = sum(1 for stop in stops if stop.priority == 'Urgent')
-            return urgent_count >= conditions.get('min_urgent', 1)
+            min_urgent = conditions.get('min_urgent', 1)
+            urgent = PRIORITY_WEIGHTS['Urgent']
+            def enough_urgent(stops, batch, now):
+                if njit is not None and len(batch.priority) >= JIT_MIN_STOPS:
+                    return _count_reaches(batch.priority, urgent, min_urgent)
+                return np.count_nonzero(batch.priority == urgent) >= min_urgent
+            return enough_urgent
             
         elif condition_type == 'delivery_window':
-            # Check if any deliveries are approaching their time windows
-            current_time = datetime.now()
-            for stop in stops:
-                if stop.delivery_window_start:
-                    window_start = datetime.fromisoformat(stop.delivery_window_start)
-                    if (window_start - current_time).seconds <= conditions.get('warning_minutes', 30) * 60:
-                        return True
-        
-        return False
+            warning_seconds = conditions.get('warning_minutes', 30) * 60
+            
+            def window_approaching(stops, batch, now):
+                # Check if any deliveries are approaching their time windows
+                for stop in stops:
+                    if stop.delivery_window_start:
+                        window_start = parse_window_start(stop.delivery_window_start)
+                        if (window_start - now).seconds <= warning_seconds:
+                            return True
+                return False
+            return window_approaching
+        
+        return lambda stops, batch, now: False
     
-    def _execute_actions(self, actions: Dict, stops: List[DeliveryStop]):
-        """Execute automation actions"""
+    def _compile_action(self, actions: Dict) -> Callable[[List[DeliveryStop], Optional[StopStats], datetime], None]:
+        """Build a callable that runs an action definition against the stops, their precomputed stats and the pass time"""
         action_type = actions.get('type')
         
         if action_type == 'optimize_route':
-            self._auto_optimize_route(stops)
+            top_k = actions.get('top_k')
+            return lambda stops, stats, now: self._auto_optimize_route(stops, top_k, now)
             
         elif action_type == 'send_notification':
-            self._send_notification(actions.get('message', 'Automation triggered'))
+            message = actions.get('message', 'Automation triggered')
+            return lambda stops, stats, now: self._send_notification(message, now)
             
         elif action_type == 'generate_report':
-            self._auto_generate_report(stops, actions.get('report_type'))
+            report_type = actions.get('report_type')
+            return lambda stops, stats, now: self._auto_generate_report(stops, report_type, stats, now)
             
         elif action_type == 'backup_data':
-            self._auto_backup_data()
+            return lambda stops, stats, now: self._auto_backup_data(now)
+        
+        return lambda stops, stats, now: None
     
-    def _auto_optimize_route(self, stops: List[DeliveryStop]):
-        """Automatically optimize route using advanced algorithms"""
+    def _auto_optimize_route(self, stops: List[DeliveryStop], top_k: Optional[int] = None,
+                             now: Optional[datetime] = None):
+        """Automatically optimize route using advanced algorithms.
+        
+        With top_k only the next top_k stops are ranked (O(N log K)); the rest keep
+        their current order behind them.
+        """
         # Advanced route optimization (simplified version)
-        def priority_weight(stop):
-            weights = {'Urgent': 4, 'High': 3, 'Normal': 2, 'Low': 1}
-            return weights.get(stop.priority, 2)
+        priority_weight = PRIORITY_WEIGHTS.get
+        
+        # One clock reading for the whole sort keeps the weights consistent
+        now = now or datetime.now()
         
         def delivery_window_weight(stop):
             if not stop.delivery_window_start:
                 return 0
-            window_start = datetime.fromisoformat(stop.delivery_window_start)
-            time_to_window = (window_start - datetime.now()).total_seconds() / 3600
+            window_start = parse_window_start(stop.delivery_window_start)
+            time_to_window = (window_start - now).total_seconds() / 3600
             return max(0, 24 - time_to_window)  # Higher weight for sooner windows
         
-        # Sort by combined priority and delivery window weights
-        stops.sort(key=lambda x: -(priority_weight(x) * 2 + delivery_window_weight(x)), reverse=False)
+        def weight(stop):
+            return priority_weight(stop.priority, 2) * 2 + delivery_window_weight(stop)
+        
+        # Order by combined priority and delivery window weights, heaviest first
+        if top_k is not None and top_k < len(stops):
+            head = heapq.nlargest(top_k, stops, key=weight)
+            chosen = {id(stop) for stop in head}
+            stops[:] = head + [stop for stop in stops if id(stop) not in chosen]
+        else:
+            stops.sort(key=weight, reverse=True)
         
-        self._send_notification("Route automatically optimized based on priority and delivery windows")
+        self._send_notification("Route automatically optimized based on priority and delivery windows", now)
     
-    def _send_notification(self, message: str):
-        """Send notification to the system"""
-        notification = {
-            'id': len(self.notifications) + 1,
-            'message': message,
-            'timestamp': datetime.now().isoformat(),
-            'type': 'automation',
-            'read': False
-        }
-        self.notifications.append(notification)
+    def _send_notification(self, message: str, now: Optional[datetime] = None):
+        """Send notification to the system, stamped with now or the current time"""
+        with self._notification_lock:
+            notification = {
+                'id': next(self._notification_ids),
+                'message': message,
+                'timestamp': (now or datetime.now()).isoformat(),
+                'type': 'automation',
+                'read': False
+            }
+            self.notifications.append(notification)
     
-    def _auto_generate_report(self, stops: List[DeliveryStop], report_type: str):
+    def _auto_generate_report(self, stops: List[DeliveryStop], report_type: str, stats: Optional[StopStats] = None,
+                              now: Optional[datetime] = None):
         """Automatically generate reports"""
         if report_type == 'daily_summary':
-            self._generate_daily_summary_report(stops)
+            self._generate_daily_summary_report(stops, stats, now)
         elif report_type == 'efficiency_analysis':
-            self._generate_efficiency_report(stops)
+            self._generate_efficiency_report(stops, stats, now)
     
-    def _auto_backup_data(self):
+    def _auto_backup_data(self, now: Optional[datetime] = None):
         """Automatically backup database"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        now = now or datetime.now()
+        timestamp = now.strftime('%Y%m%d_%H%M%S')
         backup_path = f"backup_courier_data_{timestamp}.db"
         
-        # Simple file copy for backup
-        import shutil
         try:
-            shutil.copy2(self.db_path, backup_path)
-            self._send_notification(f"Data automatically backed up to {backup_path}")
+            self._backup_database(self.db_path, backup_path)
+            self._send_notification(f"Data automatically backed up to {backup_path}", now)
         except Exception as e:
-            self._send_notification(f"Backup failed: {str(e)}")
+            self._send_notification(f"Backup failed: {str(e)}", now)
     
-    def _generate_daily_summary_report(self, stops: List[DeliveryStop]):
+    @staticmethod
+    def _backup_database(src_path: str, dst_path: str):
+        """Snapshot a live SQLite database with the online backup API.
+        
+        Unlike a byte copy of the file, this includes commits still sitting in the -wal file
+        and never captures a half-written page.
+        """
+        if not os.path.exists(src_path):
+            raise FileNotFoundError(src_path)
+        src = sqlite3.connect(src_path)
+        dst = sqlite3.connect(dst_path)
+        try:
+            src.backup(dst, pages=BACKUP_PAGES)
+        finally:
+            dst.close()
+            src.close()
+    
+    def _generate_daily_summary_report(self, stops: List[DeliveryStop], stats: Optional[StopStats] = None,
+                                       now: Optional[datetime] = None):
         """Generate daily summary report"""
+        if stats is None:
+            stats = StopStats.from_stops(stops)
+        now = now or datetime.now()
+        
         report_data = {
-            'date': datetime.now().strftime('%Y-%m-%d'),
-            'total_stops': len(stops),
-            'completed_stops': len([s for s in stops if s.status == 'completed']),
-            'pending_stops': len([s for s in stops if s.status == 'pending']),
-            'total_load': sum(s.load_size for s in stops),
+            'date': now.strftime('%Y-%m-%d'),
+            'total_stops': stats.total,
+            'completed_stops': stats.completed,
+            'pending_stops': stats.pending,
+            'total_load': stats.total_load,
             'priority_breakdown': {
-                'urgent': len([s for s in stops if s.priority == 'Urgent']),
-                'high': len([s for s in stops if s.priority == 'High']),
-                'normal': len([s for s in stops if s.priority == 'Normal']),
-                'low': len([s for s in stops if s.priority == 'Low'])
+                label.lower(): count for label, count in stats.per_priority.items()
             }
         }
         
         # Save report to JSON
-        filename = f"daily_summary_{datetime.now().strftime('%Y%m%d')}.json"
-        with open(filename, 'w') as f:
-            json.dump(report_data, f, indent=2)
+        filename = f"daily_summary_{now.strftime('%Y%m%d')}.json"
+        with open(filename, 'wb') as f:
+            f.write(dump_json(report_data))
         
-        self._send_notification(f"Daily summary report generated: {filename}")
+        self._send_notification(f"Daily summary report generated: {filename}", now)
     
-    def _generate_efficiency_report(self, stops: List[DeliveryStop]):
+    def _generate_efficiency_report(self, stops: List[DeliveryStop], stats: Optional[StopStats] = None,
+                                    now: Optional[datetime] = None):
         """Generate efficiency analysis report"""
-        # Calculate efficiency metrics
-        completed_stops = [s for s in stops if s.status == 'completed']
+        if stats is None:
+            stats = StopStats.from_stops(stops)
         
-        if not completed_stops:
+        if not stats.completed:
             return
         
-        avg_delivery_time = sum(s.estimated_time for s in completed_stops) / len(completed_stops)
-        load_efficiency = sum(s.load_size for s in stops) / 15.0 * 100  # Assuming 15m³ capacity
+        avg_delivery_time = stats.completed_time / stats.completed
+        load_efficiency = stats.total_load / 15.0 * 100  # Assuming 15m³ capacity
+        now = now or datetime.now()
         
         efficiency_data = {
-            'date': datetime.now().strftime('%Y-%m-%d'),
+            'date': now.strftime('%Y-%m-%d'),
             'metrics': {
                 'average_delivery_time': avg_delivery_time,
                 'load_efficiency_percent': load_efficiency,
-                'completion_rate': len(completed_stops) / len(stops) * 100,
-                'priority_distribution': {
-                    priority: len([s for s in stops if s.priority == priority])
-                    for priority in ['Urgent', 'High', 'Normal', 'Low']
-                }
+                'completion_rate': stats.completed / stats.total * 100,
+                'priority_distribution': dict(stats.per_priority)
             },
-            'recommendations': self._generate_efficiency_recommendations(stops)
+            'recommendations': self._generate_efficiency_recommendations(stops, stats)
         }
         
-        filename = f"efficiency_report_{datetime.now().strftime('%Y%m%d')}.json"
-        with open(filename, 'w') as f:
-            json.dump(efficiency_data, f, indent=2)
+        filename = f"efficiency_report_{now.strftime('%Y%m%d')}.json"
+        with open(filename, 'wb') as f:
+            f.write(dump_json(efficiency_data))
         
-        self._send_notification(f"Efficiency report generated: {filename}")
+        self._send_notification(f"Efficiency report generated: {filename}", now)
     
-    def _generate_efficiency_recommendations(self, stops: List[DeliveryStop]) -> List[str]:
+    def _generate_efficiency_recommendations(self, stops: List[DeliveryStop],
+                                             stats: Optional[StopStats] = None) -> List[str]:
         """Generate efficiency improvement recommendations"""
+        if stats is None:
+            stats = StopStats.from_stops(stops)
         recommendations = []
         
         # Analyze load distribution
-        total_load = sum(s.load_size for s in stops)
-        if total_load < 10:  # Assuming 15m³ capacity
+        if stats.total_load < 10:  # Assuming 15m³ capacity
             recommendations.append("Consider consolidating deliveries to improve load efficiency")
         
         # Analyze priority distribution
-        urgent_count = len([s for s in stops if s.priority == 'Urgent'])
-        if urgent_count > len(stops) * 0.3:
+        if stats.per_priority['Urgent'] > stats.total * 0.3:
             recommendations.append("High number of urgent deliveries - consider improving planning process")
         
         # Analyze delivery time distribution
-        long_deliveries = [s for s in stops if s.estimated_time > 30]
-        if len(long_deliveries) > len(stops) * 0.2:
+        if stats.long_deliveries > stats.total * 0.2:
             recommendations.append("Consider breaking down long delivery routes")
         
         return recommendations
@@ -233,9 +509,17 @@ class TaskAutomationEngine:
 class ContentCreationEngine:
     """Advanced content creation engine for reports, invoices, and documents"""
     
+    # Column order of export_to_csv
+    CSV_FIELDS = (
+        'id', 'address', 'priority', 'delivery_type', 'load_size',
+        'estimated_time', 'status', 'customer_name', 'customer_phone',
+        'special_instructions', 'created_at', 'completed_at'
+    )
+    
     def __init__(self, db_path: str):
         self.db_path = db_path
         self.templates = {}
+        self._renderers = {}
         self.load_templates()
     
     def load_templates(self):
@@ -246,15 +530,18 @@ class ContentCreationEngine:
             'daily_report': self._get_daily_report_template(),
             'route_summary': self._get_route_summary_template()
         }
+        # Templates are compiled once; the generate_* methods call the render functions
+        self._renderers = {name: compile_template(text) for name, text in self.templates.items()}
     
     def generate_delivery_confirmation(self, stop: DeliveryStop, driver_name: str = "Driver") -> str:
         """Generate delivery confirmation document"""
-        template = self.templates['delivery_confirmation']
+        render = self._renderers['delivery_confirmation']
+        now = datetime.now()
         
-        return template.format(
+        return render(
             delivery_id=stop.id,
-            date=datetime.now().strftime('%Y-%m-%d'),
-            time=datetime.now().strftime('%H:%M'),
+            date=now.strftime('%Y-%m-%d'),
+            time=now.strftime('%H:%M'),
             customer_name=stop.customer_name or "Customer",
             address=stop.address,
             items_delivered=f"{stop.load_size}m³ of cargo",
@@ -265,13 +552,15 @@ class ContentCreationEngine:
     
     def generate_invoice(self, stops: List[DeliveryStop], customer_info: Dict) -> str:
         """Generate invoice for deliveries"""
-        template = self.templates['invoice']
+        render = self._renderers['invoice']
         
         # Calculate totals
         base_rate = 25.0  # Base rate per delivery
         volume_rate = 3.5  # Rate per m³
         
-        line_items = []
+        # Line items are written straight into one buffer while the total accumulates
+        line_items = io.StringIO()
+        separator = ''
         total = 0
         
         for stop in stops:
@@ -280,14 +569,16 @@ class ContentCreationEngine:
             line_total = delivery_charge + volume_charge
             total += line_total
             
-            line_items.append(f"Delivery to {stop.address}: ${delivery_charge:.2f} + ${volume_charge:.2f} = ${line_total:.2f}")
+            line_items.write(f"{separator}Delivery to {stop.address}: ${delivery_charge:.2f} + ${volume_charge:.2f} = ${line_total:.2f}")
+            separator = '\n'
         
-        return template.format(
-            invoice_id=f"INV-{datetime.now().strftime('%Y%m%d')}-{len(stops):03d}",
-            date=datetime.now().strftime('%Y-%m-%d'),
+        now = datetime.now()
+        return render(
+            invoice_id=f"INV-{now.strftime('%Y%m%d')}-{len(stops):03d}",
+            date=now.strftime('%Y-%m-%d'),
             customer_name=customer_info.get('name', 'Customer'),
             customer_address=customer_info.get('address', ''),
-            line_items='\n'.join(line_items),
+            line_items=line_items.getvalue(),
             subtotal=total,
             tax=total * 0.1,  # 10% tax
             total=total * 1.1
@@ -295,21 +586,20 @@ class ContentCreationEngine:
     
     def generate_daily_report(self, stops: List[DeliveryStop], driver_name: str = "Driver") -> str:
         """Generate daily operations report"""
-        template = self.templates['daily_report']
+        render = self._renderers['daily_report']
         
-        completed = [s for s in stops if s.status == 'completed']
-        pending = [s for s in stops if s.status == 'pending']
+        stats = StopStats.from_stops(stops)
         
         statistics = {
-            'total_stops': len(stops),
-            'completed': len(completed),
-            'pending': len(pending),
-            'completion_rate': (len(completed) / len(stops) * 100) if stops else 0,
-            'total_volume': sum(s.load_size for s in stops),
-            'total_time': sum(s.estimated_time for s in stops)
+            'total_stops': stats.total,
+            'completed': stats.completed,
+            'pending': stats.pending,
+            'completion_rate': (stats.completed / stats.total * 100) if stats.total else 0,
+            'total_volume': stats.total_load,
+            'total_time': stats.total_time
         }
         
-        return template.format(
+        return render(
             date=datetime.now().strftime('%Y-%m-%d'),
             driver_name=driver_name,
             **statistics
@@ -317,7 +607,7 @@ class ContentCreationEngine:
     
     def generate_route_summary(self, stops: List[DeliveryStop]) -> str:
         """Generate route summary document"""
-        template = self.templates['route_summary']
+        render = self._renderers['route_summary']
         
         route_details = []
         total_distance = 0
@@ -327,7 +617,7 @@ class ContentCreationEngine:
             route_details.append(f"{i}. {stop.address} - {stop.priority} priority - {stop.load_size}m³")
             total_time += stop.estimated_time
         
-        return template.format(
+        return render(
             date=datetime.now().strftime('%Y-%m-%d'),
             total_stops=len(stops),
             route_details='\n'.join(route_details),
@@ -335,49 +625,43 @@ class ContentCreationEngine:
             estimated_distance=total_time * 0.5  # Rough distance calculation
         )
     
-    def export_to_csv(self, stops: List[DeliveryStop], filename: str = None):
+    def export_to_csv(self, stops: Iterable[DeliveryStop], filename: str = None):
         """Export delivery data to CSV"""
         if not filename:
             filename = f"delivery_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = [
-                'id', 'address', 'priority', 'delivery_type', 'load_size',
-                'estimated_time', 'status', 'customer_name', 'customer_phone',
-                'special_instructions', 'created_at', 'completed_at'
-            ]
+        with open(filename, 'w', newline='', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(self.CSV_FIELDS)
             
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for stop in stops:
-                writer.writerow({
-                    'id': stop.id,
-                    'address': stop.address,
-                    'priority': stop.priority,
-                    'delivery_type': stop.delivery_type,
-                    'load_size': stop.load_size,
-                    'estimated_time': stop.estimated_time,
-                    'status': stop.status,
-                    'customer_name': stop.customer_name or '',
-                    'customer_phone': stop.customer_phone or '',
-                    'special_instructions': stop.special_instructions or '',
-                    'created_at': stop.created_at or '',
-                    'completed_at': stop.completed_at or ''
-                })
+            # Positional rows straight from the attributes, no per-row dict
+            writer.writerows(
+                (stop.id, stop.address, stop.priority, stop.delivery_type, stop.load_size,
+                 stop.estimated_time, stop.status, stop.customer_name or '', stop.customer_phone or '',
+                 stop.special_instructions or '', stop.created_at or '', stop.completed_at or '')
+                for stop in stops
+            )
         
         return filename
     
-    def export_to_json(self, stops: List[DeliveryStop], filename: str = None):
-        """Export delivery data to JSON"""
+    def export_to_json(self, stops: Iterable[DeliveryStop], filename: str = None, total_stops: int = None):
+        """Export delivery data to JSON; total_stops is required when stops has no len()"""
+        if total_stops is None:
+            # The count is written ahead of the stops, so it has to be known before streaming them
+            if not isinstance(stops, Sized):
+                raise TypeError("export_to_json needs total_stops when stops is an iterator")
+            total_stops = len(stops)
         if not filename:
             filename = f"delivery_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         
-        export_data = {
-            'export_date': datetime.now().isoformat(),
-            'total_stops': len(stops),
-            'stops': [
-                {
+        # Stream one stop at a time in the same indented layout json.dump would produce,
+        # so the full export never has to exist as a list of dicts
+        with open(filename, 'wb', buffering=EXPORT_BUFFER_SIZE) as jsonfile:
+            jsonfile.write(b'{\n  "export_date": "%s",\n  "total_stops": %d,\n  "stops": ['
+                           % (datetime.now().isoformat().encode('ascii'), total_stops))
+            first = separator = b'\n    '
+            for stop in stops:
+                record = {
                     'id': stop.id,
                     'address': stop.address,
                     'priority': stop.priority,
@@ -393,12 +677,10 @@ class ContentCreationEngine:
                     'created_at': stop.created_at,
                     'completed_at': stop.completed_at
                 }
-                for stop in stops
-            ]
-        }
-        
-        with open(filename, 'w', encoding='utf-8') as jsonfile:
-            json.dump(export_data, jsonfile, indent=2, ensure_ascii=False)
+                jsonfile.write(separator)
+                jsonfile.write(dump_json(record).replace(b'\n', b'\n    '))
+                separator = b',\n    '
+            jsonfile.write(b'\n  ]\n}' if separator is not first else b']\n}')
         
         return filename
     
@@ -493,110 +775,163 @@ Generated by CourierPro Route Planner
 class BatchOperationManager:
     """Manager for batch operations and bulk processing"""
     
+    # CSV import columns in DeliveryStop argument order, with the default used when a column is absent
+    IMPORT_COLUMNS = (
+        ('id', 0), ('address', None), ('priority', 'Normal'), ('delivery_type', 'Standard'),
+        ('load_size', None), ('estimated_time', 15), ('customer_name', None),
+        ('customer_phone', None), ('special_instructions', None)
+    )
+    IMPORT_REQUIRED = frozenset({'address', 'load_size'})
+    
     def __init__(self, db_path: str):
         self.db_path = db_path
+        # One connection for all batch work, with the table created once up front
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS deliveries (
+                id INTEGER PRIMARY KEY,
+                address TEXT,
+                load_size REAL,
+                delivery_time TEXT,
+                status TEXT DEFAULT 'pending',
+                coordinates TEXT,
+                weather_temp REAL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        # Databases created before priorities were stored lack the column
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(deliveries)')}
+        if 'priority' not in columns:
+            self._conn.execute("ALTER TABLE deliveries ADD COLUMN priority TEXT DEFAULT 'Normal'")
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_deliveries_address ON deliveries(address)')
+        self._conn.commit()
+    
+    def close(self):
+        """Close the batch database connection"""
+        self._conn.close()
     
     def import_stops_from_csv(self, filename: str) -> List[DeliveryStop]:
         """Import delivery stops from CSV file"""
         stops = []
+        # Every stop in one import shares the same creation timestamp
+        created_at = datetime.now().isoformat()
         
         try:
-            with open(filename, 'r', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
+            with open(filename, 'r', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as csvfile:
+                reader = csv.reader(csvfile)
+                header = next(reader, None)
+                if header is None:
+                    return stops
+                
+                width = len(header)
+                padding = [None] * width
+                pick = None
                 
                 for row in reader:
-                    stop = DeliveryStop(
-                        id=int(row.get('id', 0)),
-                        address=row['address'],
-                        priority=row.get('priority', 'Normal'),
-                        delivery_type=row.get('delivery_type', 'Standard'),
-                        load_size=float(row['load_size']),
-                        estimated_time=int(row.get('estimated_time', 15)),
-                        customer_name=row.get('customer_name'),
-                        customer_phone=row.get('customer_phone'),
-                        special_instructions=row.get('special_instructions'),
-                        created_at=datetime.now().isoformat()
-                    )
-                    stops.append(stop)
+                    if not row:
+                        continue
+                    if pick is None:
+                        # Resolved on the first data row, so a header-only file imports nothing
+                        # even when a required column is missing, as with DictReader
+                        pick, tail = self._import_picker(header)
+                    # Short rows read None for missing cells and extra cells are ignored, as with DictReader
+                    if len(row) != width:
+                        row = (row + padding)[:width]
+                    row += tail
+                    (stop_id, address, priority, delivery_type, load_size, estimated_time,
+                     customer_name, customer_phone, special_instructions) = pick(row)
+                    stops.append(DeliveryStop(
+                        id=int(stop_id),
+                        address=address,
+                        priority=priority,
+                        delivery_type=delivery_type,
+                        load_size=float(load_size),
+                        estimated_time=int(estimated_time),
+                        customer_name=customer_name,
+                        customer_phone=customer_phone,
+                        special_instructions=special_instructions,
+                        created_at=created_at
+                    ))
             
         except Exception as e:
             raise Exception(f"Error importing CSV: {str(e)}")
         
         return stops
     
+    def _import_picker(self, header: List[str]):
+        """Getter for the IMPORT_COLUMNS values of a row, and the defaults to append to each row.
+        
+        Absent optional columns point past the row into that tail of defaults; an absent
+        required column raises KeyError.
+        """
+        width = len(header)
+        positions = {name: i for i, name in enumerate(header)}
+        tail = []
+        for name, default in self.IMPORT_COLUMNS:
+            if name not in positions and name not in self.IMPORT_REQUIRED:
+                positions[name] = width + len(tail)
+                tail.append(default)
+        return operator.itemgetter(*(positions[name] for name, _ in self.IMPORT_COLUMNS)), tail
+    
     def bulk_update_status(self, stop_ids: List[int], new_status: str):
         """Update status for multiple stops"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Create table if it doesn't exist
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS deliveries (
-                    id INTEGER PRIMARY KEY,
-                    address TEXT,
-                    load_size REAL,
-                    delivery_time TEXT,
-                    status TEXT DEFAULT 'pending',
-                    coordinates TEXT,
-                    weather_temp REAL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
             placeholders = ','.join(['?' for _ in stop_ids])
-            cursor.execute(f'UPDATE deliveries SET status = ? WHERE id IN ({placeholders})', 
-                          [new_status] + stop_ids)
-            
-            conn.commit()
-            conn.close()
+            with self._conn:
+                self._conn.execute(f'UPDATE deliveries SET status = ? WHERE id IN ({placeholders})', 
+                                   [new_status] + stop_ids)
         except Exception as e:
             print(f"Note: Database operation skipped in test mode: {e}")
     
     def bulk_assign_priority(self, addresses: List[str], priority: str):
         """Assign priority to multiple addresses"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        for address in addresses:
-            cursor.execute('UPDATE deliveries SET status = ? WHERE address LIKE ?', 
-                          (priority, f'%{address}%'))
-        
-        conn.commit()
-        conn.close()
+        # Exact address matches go through the address index, in one transaction
+        addresses = list(addresses)
+        with self._conn:
+            for start in range(0, len(addresses), SQL_IN_CHUNK):
+                chunk = addresses[start:start + SQL_IN_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                self._conn.execute(f'UPDATE deliveries SET priority = ? WHERE address IN ({placeholders})',
+                                   [priority] + chunk)
     
     def generate_batch_reports(self, report_types: List[str], date_range: tuple = None):
         """Generate multiple reports in batch"""
         results = []
         
         # Get data for the specified date range
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         if date_range:
-            cursor.execute('SELECT * FROM deliveries WHERE created_at BETWEEN ? AND ?', date_range)
+            where, params = ' WHERE created_at BETWEEN ? AND ?', tuple(date_range)
         else:
-            cursor.execute('SELECT * FROM deliveries')
+            where, params = '', ()
         
-        data = cursor.fetchall()
-        conn.close()
-        
-        # Convert to DeliveryStop objects
-        stops = [self._row_to_delivery_stop(row) for row in data]
+        # Each report streams its own cursor, so only one chunk of stops is in memory at a time
+        def stops():
+            return self._iter_stops(self._conn.execute('SELECT * FROM deliveries' + where, params))
         
         # Generate requested reports
         content_engine = ContentCreationEngine(self.db_path)
         
         for report_type in report_types:
             if report_type == 'daily_summary':
-                filename = content_engine.export_to_json(stops, f"daily_summary_{datetime.now().strftime('%Y%m%d')}.json")
+                total = self._conn.execute('SELECT COUNT(*) FROM deliveries' + where, params).fetchone()[0]
+                filename = content_engine.export_to_json(stops(), f"daily_summary_{datetime.now().strftime('%Y%m%d')}.json",
+                                                         total_stops=total)
                 results.append(filename)
             elif report_type == 'csv_export':
-                filename = content_engine.export_to_csv(stops)
+                filename = content_engine.export_to_csv(stops())
                 results.append(filename)
         
         return results
     
+    def _iter_stops(self, cursor: sqlite3.Cursor) -> Iterator[DeliveryStop]:
+        """Yield DeliveryStop objects from a query cursor, FETCH_CHUNK_SIZE rows at a time"""
+        while True:
+            rows = cursor.fetchmany(FETCH_CHUNK_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                yield self._row_to_delivery_stop(row)
+    
     def _row_to_delivery_stop(self, row: tuple) -> DeliveryStop:
         """Convert database row to DeliveryStop object"""
         return DeliveryStop(
@@ -1,16 +1,29 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, font
 from geopy.geocoders import Nominatim
+from geopy.extra.rate_limiter import RateLimiter
 from datetime import datetime, timedelta
 import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 import json
 import os
+import re
 import requests
 import sqlite3
 import csv
-from PIL import Image, ImageTk
+import math
+import time
+import numpy as np
 import customtkinter as ctk
-from automation_engine import TaskAutomationEngine, ContentCreationEngine, BatchOperationManager, DeliveryStop
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+from automation_engine import TaskAutomationEngine, ContentCreationEngine, BatchOperationManager, DeliveryStop, dump_json
 
 # Built-in van capacity dataset
 VAN_CAPACITY_DATA = [
@@ -21,30 +34,354 @@ VAN_CAPACITY_DATA = [
     {"make": "Renault", "model": "Master", "capacity": 13.0, "fuel_efficiency": 11.8},
 ]
 
+# Vehicle dropdown entries, each mapped to its van
+VAN_BY_OPTION = {f"{v['make']} {v['model']} ({v['capacity']}m³)": v for v in VAN_CAPACITY_DATA}
+
+EARTH_RADIUS_KM = 6371.0
+
+# Stop form inputs: a plain decimal load in m³ and an optional whole number of minutes
+LOAD_PATTERN = re.compile(r"\d+(?:\.\d*)?|\.\d+")
+MINUTES_PATTERN = re.compile(r"\d{1,4}")
+
+# Distance matrix from the previous run, reused row by row for stops at the same coordinates
+DIST_CACHE_PATH = os.path.join("cache", "dist_matrix.npz")
+
+# New stops are written to the database in batches: after this delay, or sooner once this many are queued
+INSERT_FLUSH_DELAY_MS = 200
+INSERT_BATCH_SIZE = 100
+
+# Weather readings are reused for this many seconds, shared by stops in the same ~1 km grid cell
+WEATHER_TTL = 1800
+WEATHER_GRID_DECIMALS = 2
+
+# Points spanning less than this many degrees use the flat equirectangular approximation
+EQUIRECT_MAX_SPAN_DEG = 1.0
+# cos(mid latitude) is rounded to this many decimals so nearby stops keep the cached metric
+EQUIRECT_METRIC_DECIMALS = 3
+
+# Routing rank per priority label; unknown labels rank as Normal
+PRIORITY_VALUE = {"Urgent": 4, "High": 3, "Normal": 2, "Low": 1}
+
+# Marker shown next to each stop in the route text, by priority label
+PRIORITY_ICONS = {"Urgent": "🔴", "High": "🟠", "Normal": "🟡", "Low": "🟢"}
+
+# Automation rules are checked this long after the previous check finishes, sooner when a
+# time-based rule comes due; stop changes bring the next check forward to this short delay
+AUTOMATION_INTERVAL_MS = 60_000
+AUTOMATION_CHANGE_DELAY_MS = 2_000
+
+# Tab holding the route text; the text is only rebuilt while this tab is showing
+ROUTE_PLANNING_TAB = "🗺 Route Planning"
+
+def short_address(address):
+    """Address as shown in the route tree, cut to 30 characters"""
+    return address[:30] + "..." if len(address) > 30 else address
+
+def normalize_address(address):
+    """Geocode cache key: case and whitespace differences map to the same entry"""
+    return " ".join(address.lower().split())
+
+def response_json(resp):
+    """Decode an API response body, via orjson when installed; None for non-200 responses"""
+    # Non-200 bodies are error pages, not data
+    if resp.status_code != 200:
+        return None
+    if orjson is not None:
+        return orjson.loads(resp.content)
+    return resp.json()
+
+def pack_template(template_data):
+    """Route template as stored in route_data: msgpack bytes, or JSON text without msgpack"""
+    if msgpack is not None:
+        return msgpack.packb(template_data, use_bin_type=True)
+    return json.dumps(template_data)
+
+def unpack_template(route_data):
+    """Inverse of pack_template; rows saved as JSON text (or JSON bytes) still load"""
+    if isinstance(route_data, str) or route_data[:1] in (b'{', b'['):
+        return json.loads(route_data)
+    if msgpack is None:
+        raise ValueError("msgpack template found but msgpack is not installed")
+    return msgpack.unpackb(route_data, raw=False)
+
+def parse_coords(coords):
+    """Split a stored "lat,lon" string, NaN for stops that failed to geocode"""
+    try:
+        lat, lon = coords.split(',')
+        return float(lat), float(lon)
+    except (AttributeError, ValueError):
+        return np.nan, np.nan
+
+def coord_trig(lats, lons):
+    """Per-point (lat_rad, lon_rad, cos_lat) rows, the part of haversine that depends on one point"""
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lon = np.radians(np.asarray(lons, dtype=np.float64))
+    return np.column_stack((lat, lon, np.cos(lat)))
+
+def _haversine_rows_kernel(trig1, trig2):
+    """Loop form of haversine_rows for Numba, no temporaries per pair"""
+    out = np.empty((trig1.shape[0], trig2.shape[0]))
+    for i in range(trig1.shape[0]):
+        for j in range(trig2.shape[0]):
+            s_lat = math.sin((trig1[i, 0] - trig2[j, 0]) / 2)
+            s_lon = math.sin((trig1[i, 1] - trig2[j, 1]) / 2)
+            a = s_lat * s_lat + trig1[i, 2] * trig2[j, 2] * s_lon * s_lon
+            out[i, j] = 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(max(a, 0.0), 1.0)))
+    return out
+
+def _two_opt_kernel(tour, dist, tol, max_sweeps):
+    """Array form of two_opt for Numba, reversing in place on an int64 permutation"""
+    n = tour.shape[0]
+    improved = True
+    while improved and max_sweeps > 0:
+        improved = False
+        max_sweeps -= 1
+        for i in range(1, n - 1):
+            for k in range(i + 1, n):
+                a, b, c = tour[i - 1], tour[i], tour[k]
+                delta = dist[a, c] - dist[a, b]
+                if k + 1 < n:
+                    d = tour[k + 1]
+                    delta += dist[b, d] - dist[c, d]
+                if delta < -tol:
+                    lo, hi = i, k
+                    while lo < hi:
+                        tour[lo], tour[hi] = tour[hi], tour[lo]
+                        lo += 1
+                        hi -= 1
+                    improved = True
+    return tour
+
+# KD-tree nearest-stop queries for large routes when SciPy is installed
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+# Tiers with fewer stops than this scan distance matrix rows instead of building a KD-tree
+KDTREE_MIN_STOPS = 32
+
+# Compile the loop kernels when Numba is installed; NumPy and list code is faster than them uncompiled.
+# The haversine kernel skips fastmath because stops that failed to geocode carry NaN coordinates.
+try:
+    from numba import njit
+    _haversine_rows_kernel = njit(cache=True)(_haversine_rows_kernel)
+    _two_opt_kernel = njit(cache=True, fastmath=True)(_two_opt_kernel)
+except ImportError:
+    njit = None
+
+def warm_kernels():
+    """Compile the Numba kernels on tiny inputs so the first real route is not kept waiting"""
+    if njit is not None:
+        trig = coord_trig([53.0, 53.1], [-6.0, -6.1])
+        _haversine_rows_kernel(trig, trig)
+        _two_opt_kernel(np.arange(3, dtype=np.int64), np.zeros((3, 3)), 1e-8, 1)
+
+def haversine_rows(trig1, trig2):
+    """Great-circle distances in km from each coord_trig row in trig1 to each in trig2"""
+    if njit is not None:
+        return _haversine_rows_kernel(np.ascontiguousarray(trig1), np.ascontiguousarray(trig2))
+    dlat = trig1[:, 0, None] - trig2[None, :, 0]
+    dlon = trig1[:, 1, None] - trig2[None, :, 1]
+    a = np.sin(dlat / 2) ** 2 + trig1[:, 2, None] * trig2[None, :, 2] * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def equirect_rows(trig1, trig2, cos_mid):
+    """Flat-earth distances in km, accurate to well under 1% across a city-sized area"""
+    x = (trig1[:, 1, None] - trig2[None, :, 1]) * cos_mid
+    y = trig1[:, 0, None] - trig2[None, :, 0]
+    return EARTH_RADIUS_KM * np.hypot(x, y)
+
+def distance_metric(trig):
+    """Rounded cos(mid latitude) for the flat approximation when all points are close together, None for haversine"""
+    points = trig[np.isfinite(trig[:, 0])]
+    if len(points):
+        lat_lo, lat_hi = points[:, 0].min(), points[:, 0].max()
+        span = max(lat_hi - lat_lo, np.ptp(points[:, 1]))
+        if span < np.radians(EQUIRECT_MAX_SPAN_DEG):
+            return round(float(np.cos((lat_lo + lat_hi) / 2)), EQUIRECT_METRIC_DECIMALS)
+    return None
+
+def distance_rows(trig1, trig2, metric):
+    """Distances in km between coord_trig rows under a distance_metric result"""
+    if metric is None:
+        return haversine_rows(trig1, trig2)
+    return equirect_rows(trig1, trig2, metric)
+
+def haversine_matrix(lats, lons):
+    """Pairwise great-circle distances in km for arrays of degrees"""
+    trig = coord_trig(lats, lons)
+    return haversine_rows(trig, trig)
+
+def nearest_neighbor_order(dist, members, start=None):
+    """Greedy tour over the stop indices in members, first hop taken from start"""
+    members = np.asarray(members, dtype=np.intp)
+    remaining = np.ones(len(members), dtype=bool)
+    order = []
+    current = start
+    for _ in range(len(members)):
+        candidates = np.flatnonzero(remaining)
+        if current is None:
+            pick = candidates[0]
+        else:
+            pick = candidates[int(dist[current, members[candidates]].argmin())]
+        remaining[pick] = False
+        current = int(members[pick])
+        order.append(current)
+    return order
+
+def planar_points(coords):
+    """(x, y) in radians with longitude scaled by cos(lat), a cheap proxy for nearest-stop queries"""
+    lat = np.radians(coords[:, 0])
+    return np.column_stack((np.radians(coords[:, 1]) * np.cos(lat), lat))
+
+def nearest_neighbor_kdtree(points, members, start=None):
+    """nearest_neighbor_order for large tiers, querying a KD-tree instead of scanning matrix rows"""
+    members = np.asarray(members, dtype=np.intp)
+    finite = np.isfinite(points[members]).all(axis=1)
+    located = members[finite]
+    tree = cKDTree(points[located])
+    visited = np.zeros(len(located), dtype=bool)
+    order = []
+    current = None
+    if start is not None and np.isfinite(points[start]).all():
+        current = points[start]
+    for _ in range(len(located)):
+        pick = 0
+        if current is not None:
+            # Widen the query until it reaches an unvisited stop
+            k = min(16, len(located))
+            while True:
+                _, idx = tree.query(current, k=k)
+                free = np.atleast_1d(idx)[~visited[np.atleast_1d(idx)]]
+                if len(free) or k == len(located):
+                    break
+                k = min(k * 4, len(located))
+            pick = int(free[0])
+        elif visited[0]:
+            pick = int(np.flatnonzero(~visited)[0])
+        visited[pick] = True
+        current = points[located[pick]]
+        order.append(int(located[pick]))
+    # Stops without coordinates go last, as with the matrix version
+    return order + [int(m) for m in members[~finite]]
+
+def two_opt(tour, dist, tol=1e-8, max_sweeps=None):
+    """Reverse segments while that shortens the open path; tour[0] stays fixed"""
+    n = len(tour)
+    sweeps = max_sweeps if max_sweeps is not None else n * n
+    if njit is not None:
+        route = np.asarray(tour, dtype=np.int64)
+        return _two_opt_kernel(route, np.ascontiguousarray(dist, dtype=np.float64), tol, sweeps).tolist()
+    tour = list(tour)
+    improved = True
+    while improved and sweeps > 0:
+        improved = False
+        sweeps -= 1
+        for i in range(1, n - 1):
+            for k in range(i + 1, n):
+                a, b, c = tour[i - 1], tour[i], tour[k]
+                delta = dist[a, c] - dist[a, b]
+                if k + 1 < n:
+                    d = tour[k + 1]
+                    delta += dist[b, d] - dist[c, d]
+                if delta < -tol:
+                    tour[i:k + 1] = tour[i:k + 1][::-1]
+                    improved = True
+    return tour
+
 try:
     from tkintermapview import TkinterMapView
 except ImportError:
     TkinterMapView = None
 
 class CourierProApp(ctk.CTk):
+    # Font roles shared by every widget; the CTkFont objects are built once per app
+    FONT_SPECS = {
+        "title": {"size": 24, "weight": "bold"},
+        "dialog_title": {"size": 20, "weight": "bold"},
+        "heading": {"size": 18, "weight": "bold"},
+        "placeholder": {"size": 18},
+        "section": {"size": 16, "weight": "bold"},
+        "caption": {"size": 12},
+    }
+    
+    # The customtkinter theme is process-wide, so it only needs applying once
+    _theme_applied = False
+    
+    # Settings are updated in place; INSERT OR REPLACE would delete and reinsert the row
+    UPSERT_SETTING_SQL = ('INSERT INTO settings (key, value) VALUES (?, ?) '
+                          'ON CONFLICT(key) DO UPDATE SET value = excluded.value')
+    
     def __init__(self):
         super().__init__()
         
         # Configure window
         self.title('CourierPro - Advanced Delivery Management Suite')
         self.geometry('1400x900')
-        ctk.set_appearance_mode("dark")
-        ctk.set_default_color_theme("blue")
+        if not CourierProApp._theme_applied:
+            ctk.set_appearance_mode("dark")
+            ctk.set_default_color_theme("blue")
+            CourierProApp._theme_applied = True
+        self.fonts = {name: ctk.CTkFont(**spec) for name, spec in self.FONT_SPECS.items()}
         
         # Initialize data
         self.stops = []
         self.progress = 0
         self.total_capacity = 0
         self.used_capacity = 0
-        self.weather_cache = {}
+        self.total_est_time = 0
         self.delivery_history = []
         self.route_templates = []
         
+        # Widgets the update methods touch, filled in by create_modern_ui
+        self.stats_labels = {}
+        self.map_display = None
+        self.route_tree = None
+        
+        # Distance matrix cache, one row per entry in _dist_keys, with each stop's coord_trig row
+        self._dist_keys = []
+        self._dist_matrix = np.zeros((0, 0))
+        self._dist_trig = np.zeros((0, 3))
+        # distance_metric the cached rows were computed with; every row shares it
+        self._dist_metric = None
+        self._dist_lock = threading.Lock()
+        # Set when rows were added since the cache file was written; it is saved once, on close
+        self._dist_dirty = False
+        self.load_distance_cache()
+        
+        # Geocoding, weather and travel-time lookups for new stops share a bounded pool
+        self.geo_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='geo')
+        # Nominatim lookups in progress by normalize_address key; repeats of an address wait on the first
+        self._geo_inflight = {}
+        self._geo_inflight_lock = threading.Lock()
+        
+        # Route optimization runs on one worker thread so the UI stays responsive
+        self._route_pool = ThreadPoolExecutor(max_workers=1)
+        self._optimizing = False
+        
+        # Automation rule checks run on their own worker, scheduled from the Tk loop
+        self._automation_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='automation')
+        self._automation_job = None
+        self._automation_future = None
+        self._automation_due = 0.0
+        self._automation_rerun = False
+        self._closing = False
+        
+        # Statistics, map text and the route tree are redrawn at most once per idle pass
+        self._redraw_pending = False
+        self._tree_dirty = False
+        self._map_dirty = False
+        self._map_text = None
+        self._stat_text = {}
+        
+        # Last values written to each route tree row, by item id
+        self._row_values = {}
+        
+        # Delivery rows waiting for the next batched insert
+        self._pending_inserts = []
+        self._flush_pending = False
+        
         # Setup database
         self.setup_database()
         
@@ -56,11 +393,22 @@ class CourierProApp(ctk.CTk):
         # Setup automation rules
         self.setup_default_automation_rules()
         
-        # Initialize geocoder
+        # Compile the routing kernels in the background while the UI builds
+        if njit is not None:
+            threading.Thread(target=warm_kernels, daemon=True).start()
+        
+        # Initialize geocoder; Nominatim's usage policy allows at most one request per second
         self.geolocator = Nominatim(user_agent="courierpro_v2")
+        self._geocode = RateLimiter(self.geolocator.geocode, min_delay_seconds=1.0)
+        
+        # Keep-alive session for the weather and routing APIs
+        self._http = requests.Session()
+        # Minutes between (start, end) coordinate pairs the routing APIs already answered
+        self._travel_cache = {}
         self.stop_counter = 1
         
         # Create UI
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
         self.create_modern_ui()
         self.load_saved_data()
         
@@ -70,8 +418,16 @@ class CourierProApp(ctk.CTk):
     def setup_database(self):
         """Initialize SQLite database for data persistence"""
         self.db_path = "courier_data.db"
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # One connection for the app's lifetime; the geocoding thread writes through it too
+        self.db_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.db_lock = threading.Lock()
+        self.db_conn.execute('PRAGMA journal_mode=WAL')
+        self.db_conn.execute('PRAGMA synchronous=NORMAL')
+        self.db_conn.execute('PRAGMA temp_store=MEMORY')
+        # Read through a 256 MB memory map and keep up to 64 MB of pages cached
+        self.db_conn.execute('PRAGMA mmap_size=268435456')
+        self.db_conn.execute('PRAGMA cache_size=-65536')
+        cursor = self.db_conn.cursor()
         
         # Create tables
         cursor.execute('''
@@ -92,11 +448,27 @@ class CourierProApp(ctk.CTk):
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 name TEXT NOT NULL,
                 description TEXT,
-                route_data TEXT NOT NULL,
+                route_data BLOB NOT NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
         
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS geocode_cache (
+                key TEXT PRIMARY KEY,
+                lat REAL NOT NULL,
+                lon REAL NOT NULL
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS weather_cache (
+                key TEXT PRIMARY KEY,
+                temp REAL NOT NULL,
+                ts INTEGER NOT NULL
+            )
+        ''')
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS settings (
                 key TEXT PRIMARY KEY,
@@ -104,8 +476,39 @@ class CourierProApp(ctk.CTk):
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        # Newest-first template listing and status filters read these instead of scanning and sorting
+        cursor.execute('CREATE INDEX IF NOT EXISTS ix_templates_created ON route_templates(created_at DESC)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS ix_deliveries_status ON deliveries(status, created_at DESC)')
+        
+        self.db_conn.commit()
+        
+        # Earlier geocoding results, by normalize_address key
+        self._geo_cache = {key: (lat, lon) for key, lat, lon in cursor.execute('SELECT key, lat, lon FROM geocode_cache')}
+        # Weather readings still within their TTL, as (temp, fetched at) by grid key
+        self.weather_cache = {key: (temp, ts) for key, temp, ts in cursor.execute(
+            'SELECT key, temp, ts FROM weather_cache WHERE ts > ?', (int(time.time()) - WEATHER_TTL,))}
+    
+    def on_close(self):
+        """Stop the worker pools, close the database connections and the window"""
+        self._closing = True
+        if self._automation_job is not None:
+            self.after_cancel(self._automation_job)
+            self._automation_job = None
+        # A rule check still on the worker reports back through after(), so blocking here would
+        # deadlock; finish_automation_check closes again once it is done
+        if self._automation_future is not None and not self._automation_future.done():
+            return
+        self._automation_pool.shutdown(wait=False, cancel_futures=True)
+        # Lets a running backup or report action finish before its pool goes away
+        self.automation_engine.shutdown()
+        self.batch_manager.close()
+        self.geo_pool.shutdown(wait=False, cancel_futures=True)
+        self._route_pool.shutdown(wait=False, cancel_futures=True)
+        self.flush_inserts()
+        self.save_distance_cache()
+        with self.db_lock:
+            self.db_conn.close()
+        self.destroy()
     
     def create_modern_ui(self):
         """Create the modern, professional UI"""
@@ -119,7 +522,7 @@ class CourierProApp(ctk.CTk):
         header_frame.pack(fill="x", pady=(0, 20))
         
         title_label = ctk.CTkLabel(header_frame, text="CourierPro - Advanced Delivery Management",
-                                 font=ctk.CTkFont(size=24, weight="bold"))
+                                 font=self.fonts["title"])
         title_label.pack(side="left", padx=20, pady=15)
         
         # Quick action buttons
@@ -136,10 +539,11 @@ class CourierProApp(ctk.CTk):
                      width=120, height=35).pack(side="left", padx=5)
         
         # Create notebook for tabs
-        self.notebook = ctk.CTkTabview(main_frame)
+        self.notebook = ctk.CTkTabview(main_frame, command=self.on_tab_changed)
         self.notebook.pack(fill="both", expand=True)
         
-        # Create tabs
+        # Create tabs; all but route planning fill in their contents when first shown
+        self._tab_builders = {}
         self.create_route_planning_tab()
         self.create_delivery_tracking_tab()
         self.create_fleet_management_tab()
@@ -147,7 +551,7 @@ class CourierProApp(ctk.CTk):
     
     def create_route_planning_tab(self):
         """Create the route planning tab with enhanced features"""
-        tab = self.notebook.add("🗺 Route Planning")
+        tab = self.notebook.add(ROUTE_PLANNING_TAB)
         
         # Left panel for controls
         left_panel = ctk.CTkFrame(tab)
@@ -159,7 +563,7 @@ class CourierProApp(ctk.CTk):
         van_section.pack(fill="x", padx=10, pady=10)
         
         ctk.CTkLabel(van_section, text="🚐 Vehicle Configuration",
-                    font=ctk.CTkFont(size=16, weight="bold")).pack(pady=10)
+                    font=self.fonts["section"]).pack(pady=10)
         
         # Van selection with enhanced dropdown
         van_frame = ctk.CTkFrame(van_section)
@@ -167,8 +571,7 @@ class CourierProApp(ctk.CTk):
         
         ctk.CTkLabel(van_frame, text="Vehicle:").pack(anchor="w")
         self.van_var = tk.StringVar()
-        van_options = [f"{v['make']} {v['model']} ({v['capacity']}m³)" for v in VAN_CAPACITY_DATA]
-        self.van_dropdown = ctk.CTkOptionMenu(van_frame, values=van_options, 
+        self.van_dropdown = ctk.CTkOptionMenu(van_frame, values=list(VAN_BY_OPTION), 
                                             command=self.on_van_selected, variable=self.van_var)
         self.van_dropdown.pack(fill="x", pady=5)
         
@@ -181,7 +584,7 @@ class CourierProApp(ctk.CTk):
         route_section.pack(fill="x", padx=10, pady=10)
         
         ctk.CTkLabel(route_section, text="📍 Add Delivery Stop",
-                    font=ctk.CTkFont(size=16, weight="bold")).pack(pady=10)
+                    font=self.fonts["section"]).pack(pady=10)
         
         # Enhanced address input with autocomplete
         address_frame = ctk.CTkFrame(route_section)
@@ -233,15 +636,16 @@ class CourierProApp(ctk.CTk):
         
         ctk.CTkButton(buttons_frame, text="➕ Add Stop", command=self.add_enhanced_stop,
                      height=40).pack(side="left", fill="x", expand=True, padx=(0, 5))
-        ctk.CTkButton(buttons_frame, text="🔄 Optimize Route", command=self.optimize_route,
-                     height=40).pack(side="right", fill="x", expand=True, padx=(5, 0))
+        self.optimize_button = ctk.CTkButton(buttons_frame, text="🔄 Optimize Route", command=self.optimize_route,
+                                             height=40)
+        self.optimize_button.pack(side="right", fill="x", expand=True, padx=(5, 0))
         
         # Route list with enhanced view
         list_section = ctk.CTkFrame(left_panel)
         list_section.pack(fill="both", expand=True, padx=10, pady=10)
         
         ctk.CTkLabel(list_section, text="📋 Route Overview",
-                    font=ctk.CTkFont(size=16, weight="bold")).pack(pady=10)
+                    font=self.fonts["section"]).pack(pady=10)
         
         # Create enhanced treeview for route display
         columns = ("Stop", "Address", "Priority", "Type", "Load", "Status")
@@ -280,7 +684,7 @@ class CourierProApp(ctk.CTk):
         map_section.pack(fill="both", expand=True, pady=(0, 10))
         
         ctk.CTkLabel(map_section, text="🗺 Interactive Route Map",
-                    font=ctk.CTkFont(size=16, weight="bold")).pack(pady=10)
+                    font=self.fonts["section"]).pack(pady=10)
         
         # Map placeholder (would be replaced with actual map widget)
         self.map_display = ctk.CTkTextbox(map_section, height=300)
@@ -292,13 +696,12 @@ class CourierProApp(ctk.CTk):
         stats_section.pack(fill="x", pady=10)
         
         ctk.CTkLabel(stats_section, text="📊 Route Statistics",
-                    font=ctk.CTkFont(size=16, weight="bold")).pack(pady=10)
+                    font=self.fonts["section"]).pack(pady=10)
         
         stats_grid = ctk.CTkFrame(stats_section)
         stats_grid.pack(fill="x", padx=10, pady=10)
         
         # Statistics display
-        self.stats_labels = {}
         stats_items = [("Total Distance", "0 km"), ("Est. Time", "0 min"), 
                       ("Fuel Cost", "$0.00"), ("Load Capacity", "0%")]
         
@@ -307,7 +710,7 @@ class CourierProApp(ctk.CTk):
             frame.grid(row=i//2, column=i%2, padx=5, pady=5, sticky="ew")
             
             ctk.CTkLabel(frame, text=label).pack()
-            stat_label = ctk.CTkLabel(frame, text=value, font=ctk.CTkFont(size=18, weight="bold"))
+            stat_label = ctk.CTkLabel(frame, text=value, font=self.fonts["heading"])
             stat_label.pack()
             self.stats_labels[label] = stat_label
         
@@ -316,36 +719,45 @@ class CourierProApp(ctk.CTk):
     
     def create_delivery_tracking_tab(self):
         """Create delivery tracking tab"""
-        tab = self.notebook.add("📦 Delivery Tracking")
-        
+        self.notebook.add("📦 Delivery Tracking")
+        self._tab_builders["📦 Delivery Tracking"] = self.build_delivery_tracking_tab
+    
+    def build_delivery_tracking_tab(self, tab):
+        """Fill in the delivery tracking tab"""
         ctk.CTkLabel(tab, text="Real-time delivery tracking will be implemented here",
-                    font=ctk.CTkFont(size=18)).pack(expand=True)
+                    font=self.fonts["placeholder"]).pack(expand=True)
     
     def create_fleet_management_tab(self):
         """Create fleet management tab"""
-        tab = self.notebook.add("🚛 Fleet Management")
-        
+        self.notebook.add("🚛 Fleet Management")
+        self._tab_builders["🚛 Fleet Management"] = self.build_fleet_management_tab
+    
+    def build_fleet_management_tab(self, tab):
+        """Fill in the fleet management tab"""
         ctk.CTkLabel(tab, text="Fleet management features will be implemented here",
-                    font=ctk.CTkFont(size=18)).pack(expand=True)
+                    font=self.fonts["placeholder"]).pack(expand=True)
     
     def create_reports_tab(self):
         """Create reports and analytics tab"""
-        tab = self.notebook.add("📈 Reports & Analytics")
-        
+        self.notebook.add("📈 Reports & Analytics")
+        self._tab_builders["📈 Reports & Analytics"] = self.build_reports_tab
+    
+    def build_reports_tab(self, tab):
+        """Fill in the reports and analytics tab"""
         ctk.CTkLabel(tab, text="Advanced reporting and analytics will be implemented here",
-                    font=ctk.CTkFont(size=18)).pack(expand=True)
+                    font=self.fonts["placeholder"]).pack(expand=True)
     
     def on_van_selected(self, choice):
         """Handle vehicle selection"""
-        for van in VAN_CAPACITY_DATA:
-            if f"{van['make']} {van['model']}" in choice:
-                self.total_capacity = van['capacity']
-                efficiency = van['fuel_efficiency']
-                self.capacity_info.configure(
-                    text=f"Capacity: {van['capacity']}m³ | Fuel Efficiency: {efficiency}L/100km"
-                )
-                self.update_statistics()
-                break
+        van = VAN_BY_OPTION.get(choice)
+        if van is None:
+            return
+        self.total_capacity = van['capacity']
+        efficiency = van['fuel_efficiency']
+        self.capacity_info.configure(
+            text=f"Capacity: {van['capacity']}m³ | Fuel Efficiency: {efficiency}L/100km"
+        )
+        self.update_statistics()
     
     def add_enhanced_stop(self):
         """Add a delivery stop with enhanced features"""
@@ -360,6 +772,11 @@ class CourierProApp(ctk.CTk):
             return
         
         try:
+            # float() alone would also accept "nan", "inf" and exponents
+            if not LOAD_PATTERN.fullmatch(load_str):
+                raise ValueError("Load must be a number like 2.5")
+            if time_str and not MINUTES_PATTERN.fullmatch(time_str):
+                raise ValueError("Time must be a whole number of minutes")
             load = float(load_str)
             est_time = int(time_str) if time_str else None
             
@@ -375,28 +792,24 @@ class CourierProApp(ctk.CTk):
                 if not messagebox.askyesno('Continue?', 'Do you want to add this stop anyway?'):
                     return
             
-            # Add to route tree immediately
-            self.route_tree.insert("", 'end', values=(
-                self.stop_counter, address[:30] + "..." if len(address) > 30 else address,
-                priority, delivery_type, f"{load:.1f}m³", "Pending"
-            ))
+            # Labels are fixed once the stop exists, so redraws read them instead of reformatting
+            display_addr = short_address(address)
+            load_label = f"{load:.1f}m³"
+            # Previous stop is read here on the Tk thread; None when there is none or it has no coordinates
+            last_coords = self.stops[-1]['coords'] if self.stops else 'N/A'
+            prev = tuple(map(float, last_coords.split(','))) if last_coords != 'N/A' else None
             
-            # Geocode in background
+            # Geocode on the shared pool; the stop is added on the Tk thread once the lookups finish
             def geocode_address():
                 try:
-                    location = self.geolocator.geocode(address)
-                    coords = f"{location.latitude:.5f},{location.longitude:.5f}" if location else "N/A"
-                    weather = self.fetch_weather(location.latitude, location.longitude) if location else None
+                    location = self.cached_geocode(address)
+                    coords = f"{location[0]:.5f},{location[1]:.5f}" if location else "N/A"
+                    weather = self.fetch_weather(*location) if location else None
                     
                     # Calculate travel time if this isn't the first stop
-                    if est_time is None and self.stops:
-                        last_stop = self.stops[-1]
-                        if last_stop['coords'] != 'N/A' and location:
-                            lat, lon = map(float, last_stop['coords'].split(','))
-                            travel_time = self.fetch_travel_time((lat, lon), (location.latitude, location.longitude))
-                            est_time_final = max(int(travel_time), 5)  # Minimum 5 minutes
-                        else:
-                            est_time_final = 15  # Default
+                    if est_time is None and prev is not None and location:
+                        travel_time = self.fetch_travel_time(prev, location)
+                        est_time_final = max(int(travel_time), 5)  # Minimum 5 minutes
                     else:
                         est_time_final = est_time if est_time else 15
                         
@@ -405,10 +818,11 @@ class CourierProApp(ctk.CTk):
                     weather = None
                     est_time_final = est_time if est_time else 15
                 
-                # Store stop data
-                stop_data = {
-                    'stop': self.stop_counter,
+                return {
                     'address': address,
+                    'display_addr': display_addr,
+                    'load_label': load_label,
+                    'priority_icon': PRIORITY_ICONS.get(priority, "🟡"),
                     'priority': priority,
                     'delivery_type': delivery_type,
                     'est_time': est_time_final,
@@ -418,17 +832,9 @@ class CourierProApp(ctk.CTk):
                     'completed': False,
                     'timestamp': datetime.now().isoformat()
                 }
-                
-                self.stops.append(stop_data)
-                self.stop_counter += 1
-                self.used_capacity += load
-                
-                # Update displays
-                self.update_statistics()
-                self.update_map_display()
-                self.save_to_database(stop_data)
             
-            threading.Thread(target=geocode_address, daemon=True).start()
+            future = self.geo_pool.submit(geocode_address)
+            future.add_done_callback(lambda f: self.after(0, self.add_geocoded_stop, f))
             
             # Clear form
             self.address_entry.delete(0, 'end')
@@ -438,43 +844,115 @@ class CourierProApp(ctk.CTk):
         except ValueError as e:
             messagebox.showerror('Input Error', f'Invalid input: {str(e)}')
     
+    def add_geocoded_stop(self, future):
+        """Store a stop finished by the geocoding pool, on the Tk thread"""
+        try:
+            stop_data = future.result()
+        except Exception as e:
+            print(f"Geocoding error: {e}")
+            return
+        stop_data['stop'] = self.stop_counter
+        self.stops.append(stop_data)
+        self.stop_counter += 1
+        self.used_capacity += stop_data['load']
+        self.total_est_time += stop_data['est_time']
+        
+        # Update displays; the stop's tree row is added by the refresh
+        self._schedule_redraw(tree=True)
+        self.save_to_database(stop_data)
+    
     def optimize_route(self):
-        """Optimize the delivery route using a simple algorithm"""
+        """Optimize the delivery route by priority, then nearest-neighbor distance"""
         if len(self.stops) < 2:
             messagebox.showinfo('Route Optimization', 'Need at least 2 stops to optimize route.')
             return
+        if self._optimizing:
+            return
         
+        self._optimizing = True
+        self.optimize_button.configure(state="disabled", text="⏳ Optimizing...")
+        stops = list(self.stops)
+        future = self._route_pool.submit(self.compute_route_order, stops)
+        future.add_done_callback(lambda f: self.after(0, self.apply_route_order, stops, f))
+    
+    def compute_route_order(self, stops):
+        """Indices into stops in visiting order; runs on the route worker thread"""
         # Simple optimization: sort by priority first, then by proximity
-        def priority_value(stop):
-            priority_map = {"Urgent": 4, "High": 3, "Normal": 2, "Low": 1}
-            return priority_map.get(stop.get('priority', 'Normal'), 2)
+        # Stops without coordinates get a huge finite cost so they sort last within their priority
+        dist = np.nan_to_num(self.distance_matrix(stops), nan=1e9)
+        points = None
+        if cKDTree is not None and len(stops) >= KDTREE_MIN_STOPS:
+            coords = np.array([parse_coords(stop.get('coords')) for stop in stops], dtype=np.float64)
+            points = planar_points(coords)
+        tiers = {}
+        for i, stop in enumerate(stops):
+            tiers.setdefault(PRIORITY_VALUE.get(stop.get('priority', 'Normal'), 2), []).append(i)
+        
+        # Visit priorities in descending order, each tier continuing from where the last ended
+        order = []
+        for value in sorted(tiers, reverse=True):
+            start = order[-1:]
+            if points is not None and len(tiers[value]) >= KDTREE_MIN_STOPS:
+                tour = nearest_neighbor_kdtree(points, tiers[value], start[0] if start else None)
+            else:
+                tour = nearest_neighbor_order(dist, tiers[value], start[0] if start else None)
+            order += two_opt(start + tour, dist)[len(start):]
+        return order
+    
+    def apply_route_order(self, stops, future):
+        """Install a finished optimization on the Tk thread"""
+        self._optimizing = False
+        self.optimize_button.configure(state="normal", text="🔄 Optimize Route")
+        try:
+            order = future.result()
+        except Exception as e:
+            messagebox.showerror('Route Optimization', f'Could not optimize route: {e}')
+            return
         
-        # Sort by priority (descending) and then by estimated time
-        optimized_stops = sorted(self.stops, key=lambda x: (-priority_value(x), x.get('est_time', 0)))
+        # Stops removed while the worker ran are dropped, stops added meanwhile go last
+        current = {id(stop) for stop in self.stops}
+        optimized_stops = [stops[i] for i in order if id(stops[i]) in current]
+        placed = {id(stop) for stop in optimized_stops}
+        optimized_stops += [stop for stop in self.stops if id(stop) not in placed]
         
-        if optimized_stops != self.stops:
+        # Identity check; comparing the stop dicts field by field is needless work
+        if len(optimized_stops) != len(self.stops) or any(a is not b for a, b in zip(optimized_stops, self.stops)):
             self.stops = optimized_stops
-            self.refresh_route_display()
-            messagebox.showinfo('Route Optimized', 'Route has been optimized based on priority and travel time.')
+            self._schedule_redraw(tree=True)
+            messagebox.showinfo('Route Optimized', 'Route has been optimized based on priority and distance.')
         else:
             messagebox.showinfo('Route Optimization', 'Route is already optimized.')
     
+    def route_row(self, position, stop):
+        """Values shown in the route tree for one stop"""
+        return (
+            position,
+            stop.get('display_addr') or short_address(stop['address']),
+            stop.get('priority', 'Normal'),
+            stop.get('delivery_type', 'Standard'),
+            stop.get('load_label') or f"{stop['load']:.1f}m³",
+            "Completed" if stop.get('completed', False) else "Pending"
+        )
+    
     def refresh_route_display(self):
-        """Refresh the route display tree"""
-        # Clear current display
-        for item in self.route_tree.get_children():
-            self.route_tree.delete(item)
-        
-        # Repopulate with optimized route
-        for i, stop in enumerate(self.stops, 1):
-            self.route_tree.insert("", 'end', values=(
-                i, 
-                stop['address'][:30] + "..." if len(stop['address']) > 30 else stop['address'],
-                stop.get('priority', 'Normal'),
-                stop.get('delivery_type', 'Standard'),
-                f"{stop['load']:.1f}m³",
-                "Completed" if stop.get('completed', False) else "Pending"
-            ))
+        """Sync the route tree with self.stops, rewriting only rows whose values changed"""
+        rows = self.route_tree.get_children()
+        for i, stop in enumerate(self.stops):
+            values = self.route_row(i + 1, stop)
+            if i < len(rows):
+                item = rows[i]
+                if self._row_values.get(item) != values:
+                    self.route_tree.item(item, values=values)
+            else:
+                item = self.route_tree.insert("", 'end', values=values)
+            self._row_values[item] = values
+        
+        # Drop rows left over from removed stops
+        extra = rows[len(self.stops):]
+        if extra:
+            self.route_tree.delete(*extra)
+            for item in extra:
+                self._row_values.pop(item, None)
     
     def remove_selected_stop(self):
         """Remove selected stop from route"""
@@ -483,17 +961,29 @@ class CourierProApp(ctk.CTk):
             messagebox.showinfo('Selection', 'Please select a stop to remove.')
             return
         
+        # Row numbers all refer to the order before this removal, so the stops go in one pass
+        removed = {int(self.route_tree.item(item, 'values')[0]) - 1 for item in selected}
+        kept = []
+        for i, stop in enumerate(self.stops):
+            if i in removed:
+                self.used_capacity -= stop['load']
+                self.total_est_time -= stop.get('est_time', 0)
+            else:
+                kept.append(stop)
+        self.stops = kept
+        
+        self.route_tree.delete(*selected)
         for item in selected:
-            values = self.route_tree.item(item, 'values')
-            stop_num = int(values[0]) - 1
-            
-            if stop_num < len(self.stops):
-                removed_stop = self.stops.pop(stop_num)
-                self.used_capacity -= removed_stop['load']
-                self.route_tree.delete(item)
-        
-        self.update_statistics()
-        self.refresh_route_display()
+            self._row_values.pop(item, None)
+        self._schedule_redraw(tree=True)
+    
+    def clear_all(self):
+        """Empty the current route; the tree rows go in the next idle refresh"""
+        self.stops = []
+        self.used_capacity = 0
+        self.total_est_time = 0
+        self.stop_counter = 1
+        self._schedule_redraw(tree=True)
     
     def save_route_template(self):
         """Save current route as a template"""
@@ -501,25 +991,42 @@ class CourierProApp(ctk.CTk):
             messagebox.showinfo('Template', 'No stops to save as template.')
             return
         
-        # Simple dialog for template name
-        template_name = tk.simpledialog.askstring("Save Template", "Enter template name:")
-        if template_name:
-            template_data = {
-                'name': template_name,
-                'stops': self.stops.copy(),
-                'created': datetime.now().isoformat()
-            }
-            self.route_templates.append(template_data)
-            
-            # Save to database
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute('INSERT INTO route_templates (name, description, route_data) VALUES (?, ?, ?)',
-                         (template_name, f"Template with {len(self.stops)} stops", json.dumps(template_data)))
-            conn.commit()
-            conn.close()
-            
-            messagebox.showinfo('Template Saved', f'Route template "{template_name}" has been saved.')
+        # Modal name prompt; unlike simpledialog it returns at once and saves from its button callback
+        dialog = ctk.CTkToplevel(self)
+        dialog.title("Save Template")
+        dialog.geometry("320x140")
+        dialog.transient(self)
+        
+        ctk.CTkLabel(dialog, text="Enter template name:").pack(padx=20, pady=(15, 5), anchor="w")
+        name_entry = ctk.CTkEntry(dialog)
+        name_entry.pack(fill="x", padx=20)
+        
+        def submit(event=None):
+            template_name = name_entry.get().strip()
+            dialog.destroy()
+            if template_name:
+                self.store_route_template(template_name)
+        
+        name_entry.bind("<Return>", submit)
+        ctk.CTkButton(dialog, text="💾 Save", command=submit).pack(pady=15)
+        dialog.after(100, dialog.grab_set)
+        dialog.after(100, name_entry.focus_set)
+    
+    def store_route_template(self, template_name):
+        """Save the current stops as a named template"""
+        template_data = {
+            'name': template_name,
+            'stops': self.stops.copy(),
+            'created': datetime.now().isoformat()
+        }
+        self.route_templates.append(template_data)
+        
+        # Save to database
+        with self.db_lock, self.db_conn:
+            self.db_conn.execute('INSERT INTO route_templates (name, description, route_data) VALUES (?, ?, ?)',
+                                 (template_name, f"Template with {len(self.stops)} stops", pack_template(template_data)))
+        
+        messagebox.showinfo('Template Saved', f'Route template "{template_name}" has been saved.')
     
     def start_enhanced_route(self):
         """Start the delivery route with enhanced tracking"""
@@ -527,101 +1034,290 @@ class CourierProApp(ctk.CTk):
             messagebox.showinfo('No Route', 'Please add delivery stops first.')
             return
         
-        # Show route confirmation dialog
-        total_distance = sum(stop.get('est_time', 0) for stop in self.stops)
-        total_load = sum(stop['load'] for stop in self.stops)
-        
+        # Show route confirmation dialog; the totals are kept current as stops change
         message = f"""Route Summary:
         
 🚚 Stops: {len(self.stops)}
-⏱ Total Time: {total_distance} minutes
-📦 Total Load: {total_load:.1f}m³
+⏱ Total Time: {self.total_est_time} minutes
+📦 Total Load: {self.used_capacity:.1f}m³
 🚐 Vehicle Capacity: {self.total_capacity:.1f}m³
 
 Ready to start delivery route?"""
         
         if messagebox.askyesno('Start Route', message):
             self.notebook.set("📦 Delivery Tracking")
+            self.on_tab_changed()
             # Here you would implement real-time tracking
             messagebox.showinfo('Route Started', 'Delivery route has been started. Switch to Delivery Tracking tab for real-time updates.')
     
+    def distance_matrix(self, stops=None):
+        """Distances in km between every pair of stops, reusing cached rows"""
+        if stops is None:
+            stops = self.stops
+        # The route worker and the Tk thread share the cache
+        with self._dist_lock:
+            keys = [stop.get('coords') for stop in stops]
+            if keys == self._dist_keys:
+                return self._dist_matrix
+            
+            # Stops with identical coordinates have identical rows, so look old rows up by coords
+            index = {key: i for i, key in enumerate(self._dist_keys)}
+            old = np.array([index.get(key, -1) for key in keys], dtype=np.intp)
+            known = np.flatnonzero(old >= 0)
+            added = np.flatnonzero(old < 0)
+            
+            n = len(keys)
+            matrix = np.empty((n, n))
+            matrix[np.ix_(known, known)] = self._dist_matrix[np.ix_(old[known], old[known])]
+            trig = np.empty((n, 3))
+            trig[known] = self._dist_trig[old[known]]
+            if len(added):
+                # Only new stops are parsed and converted; existing ones keep their radians and cos(lat)
+                coords = np.array([parse_coords(keys[i]) for i in added], dtype=np.float64).reshape(-1, 2)
+                trig[added] = coord_trig(coords[:, 0], coords[:, 1])
+            
+            # Cached rows are only reused while the whole set keeps the same metric, so the
+            # matrix never mixes flat and great-circle distances or two flat scales
+            metric = distance_metric(trig)
+            if metric != self._dist_metric:
+                matrix = distance_rows(trig, trig, metric)
+            elif len(added):
+                rows = distance_rows(trig[added], trig, metric)
+                matrix[added, :] = rows
+                matrix[:, added] = rows.T
+            
+            self._dist_dirty = self._dist_dirty or bool(len(added)) or metric != self._dist_metric
+            self._dist_keys = keys
+            self._dist_matrix = matrix
+            self._dist_trig = trig
+            self._dist_metric = metric
+            return matrix
+    
+    def load_distance_cache(self):
+        """Seed the distance matrix cache from the last run's file, if it is readable"""
+        try:
+            with np.load(DIST_CACHE_PATH) as data:
+                keys, matrix, trig = list(data["keys"]), data["matrix"], data["trig"]
+                metric = float(data["metric"])
+        except (OSError, KeyError, ValueError):
+            return
+        if matrix.shape == (len(keys), len(keys)) and trig.shape == (len(keys), 3):
+            self._dist_keys = [str(key) for key in keys]
+            self._dist_matrix = matrix
+            self._dist_trig = trig
+            self._dist_metric = None if np.isnan(metric) else metric
+    
+    def save_distance_cache(self):
+        """Write the distance matrix cache to disk if it gained rows since the last save"""
+        with self._dist_lock:
+            if not self._dist_dirty:
+                return
+            self._dist_dirty = False
+            keys, matrix, trig, metric = self._dist_keys, self._dist_matrix, self._dist_trig, self._dist_metric
+        try:
+            os.makedirs(os.path.dirname(DIST_CACHE_PATH), exist_ok=True)
+            tmp_path = DIST_CACHE_PATH + ".tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez(f, keys=np.array([str(key) for key in keys]), matrix=matrix, trig=trig,
+                         metric=np.nan if metric is None else metric)
+            os.replace(tmp_path, DIST_CACHE_PATH)
+        except OSError as e:
+            print(f"Error saving distance cache: {e}")
+    
+    def route_distance(self):
+        """Total km along the current stop order, skipping legs without coordinates"""
+        n = len(self.stops)
+        if n < 2:
+            return 0.0
+        legs = self.distance_matrix()[np.arange(n - 1), np.arange(1, n)]
+        return float(np.nansum(legs))
+    
+    def _schedule_redraw(self, tree=False):
+        """Collapse bursts of stop changes into one statistics and map redraw, plus the route tree if asked"""
+        self._tree_dirty = self._tree_dirty or tree
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.after_idle(self._redraw)
+    
+    def _redraw(self):
+        """Run the redraw queued by _schedule_redraw"""
+        self._redraw_pending = False
+        if self._tree_dirty:
+            self._tree_dirty = False
+            self.refresh_route_display()
+        self.update_statistics()
+        self.update_map_display()
+        # Capacity and priority rules depend on the stops, so check them soon after a change
+        self.request_automation_check()
+    
     def update_statistics(self):
         """Update route statistics display"""
-        if hasattr(self, 'stats_labels'):
-            total_distance = sum(stop.get('est_time', 0) for stop in self.stops) * 0.5  # Rough km estimate
-            total_time = sum(stop.get('est_time', 0) for stop in self.stops)
+        if self.stats_labels:
+            total_distance = self.route_distance()
+            total_time = self.total_est_time
             fuel_cost = total_distance * 0.15  # Rough fuel cost calculation
             capacity_used = (self.used_capacity / self.total_capacity * 100) if self.total_capacity > 0 else 0
             
-            self.stats_labels["Total Distance"].configure(text=f"{total_distance:.1f} km")
-            self.stats_labels["Est. Time"].configure(text=f"{total_time} min")
-            self.stats_labels["Fuel Cost"].configure(text=f"${fuel_cost:.2f}")
-            self.stats_labels["Load Capacity"].configure(text=f"{capacity_used:.1f}%")
+            self._set_stat("Total Distance", f"{total_distance:.1f} km")
+            self._set_stat("Est. Time", f"{total_time} min")
+            self._set_stat("Fuel Cost", f"${fuel_cost:.2f}")
+            self._set_stat("Load Capacity", f"{capacity_used:.1f}%")
+    
+    def _set_stat(self, name, text):
+        """Reconfigure a statistics label only when its text changes"""
+        if self._stat_text.get(name) != text:
+            self._stat_text[name] = text
+            self.stats_labels[name].configure(text=text)
     
     def update_map_display(self):
         """Update the map display with current route"""
-        if hasattr(self, 'map_display'):
-            map_text = "📍 Current Route:\n\n"
+        if self.map_display is not None:
+            # Hidden text is not rebuilt; on_tab_changed catches up when the tab is shown
+            if self.notebook.get() != ROUTE_PLANNING_TAB:
+                self._map_dirty = True
+                return
+            self._map_dirty = False
+            
+            parts = ["📍 Current Route:\n\n"]
             for i, stop in enumerate(self.stops, 1):
                 status = "✅" if stop.get('completed', False) else "⏳"
-                priority_icon = {"Urgent": "🔴", "High": "🟠", "Normal": "🟡", "Low": "🟢"}.get(stop.get('priority', 'Normal'), "🟡")
-                map_text += f"{status} {i}. {stop['address']} {priority_icon}\n"
-                map_text += f"   Load: {stop['load']:.1f}m³ | Time: {stop.get('est_time', 0)} min\n\n"
+                priority_icon = stop.get('priority_icon') or PRIORITY_ICONS.get(stop.get('priority', 'Normal'), "🟡")
+                load_label = stop.get('load_label') or f"{stop['load']:.1f}m³"
+                parts.append(f"{status} {i}. {stop['address']} {priority_icon}\n"
+                             f"   Load: {load_label} | Time: {stop.get('est_time', 0)} min\n\n")
+            map_text = "".join(parts)
             
-            self.map_display.delete("1.0", 'end')
-            self.map_display.insert("1.0", map_text)
+            if map_text != self._map_text:
+                self._map_text = map_text
+                self.map_display.delete("1.0", 'end')
+                self.map_display.insert("1.0", map_text)
+    
+    def on_tab_changed(self):
+        """Build a tab on its first visit; bring the route text up to date if it changed while hidden"""
+        name = self.notebook.get()
+        builder = self._tab_builders.pop(name, None)
+        if builder is not None:
+            builder(self.notebook.tab(name))
+        if self._map_dirty and name == ROUTE_PLANNING_TAB:
+            self.update_map_display()
     
     def save_to_database(self, stop_data):
-        """Save stop data to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''INSERT INTO deliveries 
-                         (address, load_size, delivery_time, coordinates, weather_temp) 
-                         VALUES (?, ?, ?, ?, ?)''',
-                      (stop_data['address'], stop_data['load'], stop_data.get('est_time'),
-                       stop_data.get('coords'), stop_data.get('weather')))
-        conn.commit()
-        conn.close()
+        """Queue stop data for the next batched database insert"""
+        row = (stop_data['address'], stop_data['load'], stop_data.get('est_time'),
+               stop_data.get('coords'), stop_data.get('weather'))
+        with self.db_lock:
+            self._pending_inserts.append(row)
+            flush_now = len(self._pending_inserts) >= INSERT_BATCH_SIZE
+            schedule = not flush_now and not self._flush_pending
+            if schedule:
+                self._flush_pending = True
+        if flush_now:
+            self.flush_inserts()
+        elif schedule:
+            self.after(INSERT_FLUSH_DELAY_MS, self.flush_inserts)
+    
+    def flush_inserts(self):
+        """Write all queued stops in one transaction"""
+        with self.db_lock:
+            self._flush_pending = False
+            rows, self._pending_inserts = self._pending_inserts, []
+            if rows:
+                with self.db_conn:
+                    self.db_conn.executemany('''INSERT INTO deliveries 
+                                             (address, load_size, delivery_time, coordinates, weather_temp) 
+                                             VALUES (?, ?, ?, ?, ?)''', rows)
     
     def load_saved_data(self):
         """Load saved data from database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM route_templates ORDER BY created_at DESC LIMIT 5')
-            templates = cursor.fetchall()
-            conn.close()
+            with self.db_lock:
+                templates = self.db_conn.execute('SELECT * FROM route_templates ORDER BY created_at DESC LIMIT 5').fetchall()
             
             # Load recent templates for quick access
             for template in templates:
                 try:
-                    template_data = json.loads(template[3])
+                    template_data = unpack_template(template[3])
                     self.route_templates.append(template_data)
-                except json.JSONDecodeError:
+                except ValueError:
                     continue
                     
         except Exception as e:
             print(f"Error loading saved data: {e}")
     
+    def cached_geocode(self, address):
+        """(lat, lon) for an address, from the geocode cache or Nominatim; None if not found"""
+        key = normalize_address(address)
+        with self._geo_inflight_lock:
+            coords = self._geo_cache.get(key)
+            if coords is not None:
+                return coords
+            pending = self._geo_inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._geo_inflight[key] = Future()
+        if not owner:
+            return pending.result()
+        
+        try:
+            location = self._geocode(address)
+            coords = (location.latitude, location.longitude) if location is not None else None
+            if coords is not None:
+                self._geo_cache[key] = coords
+        except Exception as e:
+            pending.set_exception(e)
+            raise
+        else:
+            pending.set_result(coords)
+        finally:
+            with self._geo_inflight_lock:
+                del self._geo_inflight[key]
+        
+        if coords is None:
+            return None
+        with self.db_lock, self.db_conn:
+            self.db_conn.execute('INSERT INTO geocode_cache (key, lat, lon) VALUES (?, ?, ?) '
+                                 'ON CONFLICT(key) DO UPDATE SET lat = excluded.lat, lon = excluded.lon',
+                                 (key, *coords))
+        return coords
+    
     def fetch_weather(self, lat, lon):
-        """Fetch weather data for coordinates"""
+        """Fetch the temperature at coordinates, reusing recent readings for the same grid cell"""
+        lat = round(lat, WEATHER_GRID_DECIMALS)
+        lon = round(lon, WEATHER_GRID_DECIMALS)
         cache_key = f"{lat},{lon}"
-        if cache_key in self.weather_cache:
-            return self.weather_cache[cache_key]
+        now = int(time.time())
+        hit = self.weather_cache.get(cache_key)
+        if hit is not None and now - hit[1] < WEATHER_TTL:
+            return hit[0]
         
         url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&current_weather=true"
         try:
-            resp = requests.get(url, timeout=10)
-            data = resp.json()
+            resp = self._http.get(url, timeout=10)
+            data = response_json(resp) or {}
             temp = data.get("current_weather", {}).get("temperature")
             if temp is not None:
-                self.weather_cache[cache_key] = temp
+                self.weather_cache[cache_key] = (temp, now)
+                with self.db_lock, self.db_conn:
+                    self.db_conn.execute('INSERT INTO weather_cache (key, temp, ts) VALUES (?, ?, ?) '
+                                         'ON CONFLICT(key) DO UPDATE SET temp = excluded.temp, ts = excluded.ts',
+                                         (cache_key, temp, now))
             return temp
         except Exception:
             return None
     
     def fetch_travel_time(self, start, end):
         """Fetch travel time between two points"""
+        key = (round(start[0], 5), round(start[1], 5), round(end[0], 5), round(end[1], 5))
+        minutes = self._travel_cache.get(key)
+        if minutes is None:
+            minutes = self._request_travel_time(start, end)
+            if minutes is None:
+                return 15  # Default fallback time
+            self._travel_cache[key] = minutes
+        return minutes
+    
+    def _request_travel_time(self, start, end):
+        """Travel time in minutes from Google Maps or OSRM, None when both fail"""
         # Try Google Maps API first if available
         api_key = os.environ.get("GOOGLE_API_KEY")
         if api_key:
@@ -631,9 +1327,9 @@ Ready to start delivery route?"""
                 "key": api_key,
             }
             try:
-                resp = requests.get("https://maps.googleapis.com/maps/api/directions/json", 
-                                  params=params, timeout=10)
-                data = resp.json()
+                resp = self._http.get("https://maps.googleapis.com/maps/api/directions/json", 
+                                      params=params, timeout=10)
+                data = response_json(resp) or {}
                 if data.get("routes"):
                     duration = data["routes"][0]["legs"][0]["duration"]["value"] / 60
                     return duration
@@ -643,11 +1339,11 @@ Ready to start delivery route?"""
         # Fallback to OSRM
         url = f"http://router.project-osrm.org/route/v1/driving/{start[1]},{start[0]};{end[1]},{end[0]}?overview=false"
         try:
-            resp = requests.get(url, timeout=10)
-            data = resp.json()
+            resp = self._http.get(url, timeout=10)
+            data = response_json(resp) or {}
             return data["routes"][0]["duration"] / 60
         except Exception:
-            return 15  # Default fallback time
+            return None
     
     # Placeholder methods for advanced features
     def show_analytics(self):
@@ -662,7 +1358,7 @@ Ready to start delivery route?"""
         
         # Title
         ctk.CTkLabel(main_frame, text="📊 Delivery Analytics Dashboard", 
-                    font=ctk.CTkFont(size=20, weight="bold")).pack(pady=10)
+                    font=self.fonts["dialog_title"]).pack(pady=10)
         
         # Statistics display
         stats_frame = ctk.CTkFrame(main_frame)
@@ -670,9 +1366,9 @@ Ready to start delivery route?"""
         
         # Calculate real statistics
         total_stops = len(self.stops)
-        completed_stops = len([s for s in self.stops if s.get('completed', False)])
-        total_load = sum(s.get('load', 0) for s in self.stops)
-        avg_time = sum(s.get('est_time', 0) for s in self.stops) / len(self.stops) if self.stops else 0
+        completed_stops = sum(1 for s in self.stops if s.get('completed', False))
+        total_load = self.used_capacity
+        avg_time = self.total_est_time / total_stops if total_stops else 0
         
         stats_data = [
             ("Total Deliveries", total_stops),
@@ -688,8 +1384,8 @@ Ready to start delivery route?"""
             stat_frame = ctk.CTkFrame(stats_frame)
             stat_frame.grid(row=i//3, column=i%3, padx=10, pady=10, sticky="ew")
             
-            ctk.CTkLabel(stat_frame, text=label, font=ctk.CTkFont(size=12)).pack(pady=5)
-            ctk.CTkLabel(stat_frame, text=str(value), font=ctk.CTkFont(size=16, weight="bold")).pack(pady=5)
+            ctk.CTkLabel(stat_frame, text=label, font=self.fonts["caption"]).pack(pady=5)
+            ctk.CTkLabel(stat_frame, text=str(value), font=self.fonts["section"]).pack(pady=5)
         
         # Configure grid
         for i in range(3):
@@ -709,7 +1405,7 @@ Ready to start delivery route?"""
         main_frame.pack(fill="both", expand=True, padx=20, pady=20)
         
         ctk.CTkLabel(main_frame, text="📋 Route Template Manager", 
-                    font=ctk.CTkFont(size=18, weight="bold")).pack(pady=10)
+                    font=self.fonts["heading"]).pack(pady=10)
         
         # Template list
         template_frame = ctk.CTkFrame(main_frame)
@@ -719,9 +1415,9 @@ Ready to start delivery route?"""
         template_listbox = tk.Listbox(template_frame, height=15)
         template_listbox.pack(fill="both", expand=True, padx=10, pady=10)
         
-        # Populate with existing templates
-        for template in self.route_templates:
-            template_listbox.insert(tk.END, f"{template['name']} ({len(template.get('stops', []))} stops)")
+        # Populate with existing templates in one insert call
+        template_listbox.insert(tk.END, *[f"{template['name']} ({len(template.get('stops', []))} stops)"
+                                          for template in self.route_templates])
         
         # Template actions
         actions_frame = ctk.CTkFrame(main_frame)
@@ -744,7 +1440,7 @@ Ready to start delivery route?"""
         main_frame.pack(fill="both", expand=True, padx=20, pady=20)
         
         ctk.CTkLabel(main_frame, text="📤 Data Export Options", 
-                    font=ctk.CTkFont(size=18, weight="bold")).pack(pady=10)
+                    font=self.fonts["heading"]).pack(pady=10)
         
         # Export format selection
         format_frame = ctk.CTkFrame(main_frame)
@@ -785,7 +1481,7 @@ Ready to start delivery route?"""
         main_frame.pack(fill="both", expand=True, padx=20, pady=20)
         
         ctk.CTkLabel(main_frame, text="⚙ CourierPro Settings", 
-                    font=ctk.CTkFont(size=18, weight="bold")).pack(pady=10)
+                    font=self.fonts["heading"]).pack(pady=10)
         
         # Create tabview for settings categories
         settings_tabs = ctk.CTkTabview(main_frame)
@@ -853,42 +1549,73 @@ Ready to start delivery route?"""
     
     def start_automation_monitoring(self):
         """Start monitoring automation rules"""
-        def monitor():
-            while True:
-                try:
-                    # Convert stops to DeliveryStop objects for automation engine
-                    delivery_stops = []
-                    for stop in self.stops:
-                        delivery_stop = DeliveryStop(
-                            id=stop.get('stop', 0),
-                            address=stop.get('address', ''),
-                            priority=stop.get('priority', 'Normal'),
-                            delivery_type=stop.get('delivery_type', 'Standard'),
-                            load_size=stop.get('load', 0),
-                            estimated_time=stop.get('est_time', 15),
-                            status="completed" if stop.get('completed', False) else "pending"
-                        )
-                        delivery_stops.append(delivery_stop)
-                    
-                    # Check automation rules
-                    self.automation_engine.check_and_execute_rules(delivery_stops)
-                    
-                    # Check for notifications
-                    self.check_automation_notifications()
-                    
-                except Exception as e:
-                    print(f"Automation monitoring error: {e}")
-                
-                # Sleep for 60 seconds before next check
-                threading.Event().wait(60)
+        self.run_automation_check()
+    
+    def run_automation_check(self):
+        """Snapshot the stops on the Tk thread and check the automation rules against them on the worker"""
+        self._automation_job = None
+        # Convert stops to DeliveryStop objects for automation engine
+        delivery_stops = []
+        for stop in self.stops:
+            delivery_stop = DeliveryStop(
+                id=stop.get('stop', 0),
+                address=stop.get('address', ''),
+                priority=stop.get('priority', 'Normal'),
+                delivery_type=stop.get('delivery_type', 'Standard'),
+                load_size=stop.get('load', 0),
+                estimated_time=stop.get('est_time', 15),
+                status="completed" if stop.get('completed', False) else "pending"
+            )
+            delivery_stops.append(delivery_stop)
         
-        # Start monitoring in background thread
-        monitor_thread = threading.Thread(target=monitor, daemon=True)
-        monitor_thread.start()
+        future = self._automation_future = self._automation_pool.submit(
+            self.automation_engine.check_and_execute_rules, delivery_stops)
+        future.add_done_callback(lambda f: self.after(0, self.finish_automation_check, f))
+    
+    def finish_automation_check(self, future):
+        """Show notifications from a finished rule check and schedule the next one"""
+        try:
+            future.result()
+        except Exception as e:
+            print(f"Automation monitoring error: {e}")
+        
+        if self._closing:
+            self.on_close()
+            return
+        
+        # Check for notifications
+        self.check_automation_notifications()
+        
+        if self._automation_rerun:
+            self._automation_rerun = False
+            self.schedule_automation_check(AUTOMATION_CHANGE_DELAY_MS)
+            return
+        delay = AUTOMATION_INTERVAL_MS
+        now = datetime.now()
+        due = self.automation_engine.next_due_time(now)
+        if due is not None:
+            delay = min(delay, max(int((due - now).total_seconds() * 1000), 0))
+        self.schedule_automation_check(delay)
+    
+    def schedule_automation_check(self, delay_ms):
+        """Run the next rule check after delay_ms"""
+        self._automation_due = time.monotonic() + delay_ms / 1000
+        self._automation_job = self.after(delay_ms, self.run_automation_check)
+    
+    def request_automation_check(self):
+        """Bring the next rule check forward after the stops change"""
+        if self._automation_job is None:
+            # A check is running on the worker; follow it up once it finishes
+            self._automation_rerun = True
+            return
+        if time.monotonic() + AUTOMATION_CHANGE_DELAY_MS / 1000 < self._automation_due:
+            self.after_cancel(self._automation_job)
+            self.schedule_automation_check(AUTOMATION_CHANGE_DELAY_MS)
     
     def check_automation_notifications(self):
         """Check and display automation notifications"""
-        unread_notifications = [n for n in self.automation_engine.notifications if not n.get('read', False)]
+        # Snapshot first; rule actions may still be appending from the engine's pool
+        unread_notifications = [n for n in list(self.automation_engine.notifications) if not n.get('read', False)]
         
         if unread_notifications:
             # Show notification popup (in a real app, this would be more sophisticated)
@@ -902,7 +1629,9 @@ Ready to start delivery route?"""
             messagebox.showinfo("No Data", "No delivery data available for report generation.")
             return
         
-        # Convert stops to DeliveryStop objects
+        # Convert stops to DeliveryStop objects, all stamped with the same report time
+        now = datetime.now()
+        created_at = now.isoformat()
         delivery_stops = []
         for stop in self.stops:
             delivery_stop = DeliveryStop(
@@ -913,7 +1642,7 @@ Ready to start delivery route?"""
                 load_size=stop.get('load', 0),
                 estimated_time=stop.get('est_time', 15),
                 status="completed" if stop.get('completed', False) else "pending",
-                created_at=datetime.now().isoformat()
+                created_at=created_at
             )
             delivery_stops.append(delivery_stop)
         
@@ -921,7 +1650,7 @@ Ready to start delivery route?"""
         report_content = self.content_engine.generate_daily_report(delivery_stops, "Current Driver")
         
         # Save to file
-        filename = f"analytics_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+        filename = f"analytics_report_{now.strftime('%Y%m%d_%H%M%S')}.txt"
         with open(filename, 'w') as f:
             f.write(report_content)
         
@@ -941,21 +1670,14 @@ Ready to start delivery route?"""
             # Clear current route
             self.clear_all()
             
-            # Load template stops
-            for stop_data in template.get('stops', []):
-                self.stops.append(stop_data)
-                self.route_tree.insert("", 'end', values=(
-                    stop_data.get('stop', len(self.stops)),
-                    stop_data.get('address', '')[:30],
-                    stop_data.get('priority', 'Normal'),
-                    stop_data.get('delivery_type', 'Standard'),
-                    f"{stop_data.get('load', 0):.1f}m³",
-                    "Pending"
-                ))
-                self.used_capacity += stop_data.get('load', 0)
+            # Load template stops; the idle refresh rewrites the existing tree rows in place
+            stops = template.get('stops', [])
+            self.stops.extend(stops)
+            self.used_capacity = sum(stop_data.get('load', 0) for stop_data in stops)
+            self.total_est_time = sum(stop_data.get('est_time', 0) for stop_data in stops)
             
             self.stop_counter = len(self.stops) + 1
-            self.update_statistics()
+            self._schedule_redraw(tree=True)
             messagebox.showinfo("Template Loaded", f"Template '{template['name']}' loaded successfully.")
     
     def delete_template(self, listbox):
@@ -990,8 +1712,8 @@ Ready to start delivery route?"""
             )
             
             if filename:
-                with open(filename, 'w') as f:
-                    json.dump(template, f, indent=2)
+                with open(filename, 'wb') as f:
+                    f.write(dump_json(template))
                 messagebox.showinfo("Template Exported", f"Template exported to {filename}")
     
     def perform_export(self):
@@ -999,21 +1721,21 @@ Ready to start delivery route?"""
         format_type = self.export_format.get()
         
         # Filter stops based on options
-        filtered_stops = []
-        for stop in self.stops:
-            if stop.get('completed', False) and self.include_completed.get():
-                filtered_stops.append(stop)
-            elif not stop.get('completed', False) and self.include_pending.get():
-                filtered_stops.append(stop)
+        include_completed = self.include_completed.get()
+        include_pending = self.include_pending.get()
+        filtered_stops = [stop for stop in self.stops
+                          if (include_completed if stop.get('completed', False) else include_pending)]
         
         if not filtered_stops:
             messagebox.showinfo("No Data", "No data matches the selected criteria.")
             return
         
-        # Convert to DeliveryStop objects
-        delivery_stops = []
-        for stop in filtered_stops:
-            delivery_stop = DeliveryStop(
+        # Convert to DeliveryStop objects one at a time as the export writes them
+        now = datetime.now()
+        created_at = now.isoformat()
+        day = now.strftime('%Y%m%d')
+        delivery_stops = (
+            DeliveryStop(
                 id=stop.get('stop', 0),
                 address=stop.get('address', ''),
                 priority=stop.get('priority', 'Normal'),
@@ -1023,35 +1745,35 @@ Ready to start delivery route?"""
                 status="completed" if stop.get('completed', False) else "pending",
                 customer_name=stop.get('customer_name'),
                 special_instructions=stop.get('special_instructions'),
-                created_at=datetime.now().isoformat()
+                created_at=created_at
             )
-            delivery_stops.append(delivery_stop)
+            for stop in filtered_stops
+        )
         
         try:
             if format_type == "CSV":
                 filename = self.content_engine.export_to_csv(delivery_stops)
             elif format_type == "JSON": 
-                filename = self.content_engine.export_to_json(delivery_stops)
+                filename = self.content_engine.export_to_json(delivery_stops, total_stops=len(filtered_stops))
             elif format_type == "Daily Report":
-                report_content = self.content_engine.generate_daily_report(delivery_stops)
-                filename = f"daily_report_{datetime.now().strftime('%Y%m%d')}.txt"
+                report_content = self.content_engine.generate_daily_report(list(delivery_stops))
+                filename = f"daily_report_{day}.txt"
                 with open(filename, 'w') as f:
                     f.write(report_content)
             elif format_type == "Route Summary":
-                report_content = self.content_engine.generate_route_summary(delivery_stops)
-                filename = f"route_summary_{datetime.now().strftime('%Y%m%d')}.txt"
+                report_content = self.content_engine.generate_route_summary(list(delivery_stops))
+                filename = f"route_summary_{day}.txt"
                 with open(filename, 'w') as f:
                     f.write(report_content)
             elif format_type == "Delivery Confirmations":
-                # Generate multiple delivery confirmations
-                confirmations = []
-                for stop in delivery_stops:
-                    confirmation = self.content_engine.generate_delivery_confirmation(stop)
-                    confirmations.append(f"=== DELIVERY {stop.id} ===\n{confirmation}\n\n")
-                
-                filename = f"delivery_confirmations_{datetime.now().strftime('%Y%m%d')}.txt"
+                # Write each delivery confirmation as it is generated
+                filename = f"delivery_confirmations_{day}.txt"
                 with open(filename, 'w') as f:
-                    f.write('\n'.join(confirmations))
+                    separator = ''
+                    for stop in delivery_stops:
+                        confirmation = self.content_engine.generate_delivery_confirmation(stop)
+                        f.write(f"{separator}=== DELIVERY {stop.id} ===\n{confirmation}\n\n")
+                        separator = '\n'
             
             messagebox.showinfo("Export Complete", f"Data exported successfully to {filename}")
             
@@ -1068,23 +1790,13 @@ Ready to start delivery route?"""
         }
         
         # Save to database
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        for key, value in settings.items():
-            cursor.execute('INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)',
-                          (key, json.dumps(value)))
-        
-        conn.commit()
-        conn.close()
+        with self.db_lock, self.db_conn:
+            self.db_conn.executemany(self.UPSERT_SETTING_SQL,
+                                     [(key, json.dumps(value)) for key, value in settings.items()])
         
         messagebox.showinfo("Settings Saved", "Settings have been saved successfully.")
 
 
 if __name__ == '__main__':
-    # Import simpledialog for template naming
-    import tkinter.simpledialog
-    tk.simpledialog = tkinter.simpledialog
-    
     app = CourierProApp()
     app.mainloop()
\ No newline at end of file
@@ -189,6 +189,160 @@ def test_backend_features():
         traceback.print_exc()
         return False
 
+def test_compile_template_matches_format():
+    """Compiled templates render exactly what str.format gives"""
+    from automation_engine import compile_template
+
+    values = {'name': "O'Brien \"Jr\" \\", 'total': 1234.5, 'count': 3, 'note': '{not a field}', 'class': 'x'}
+    templates = [
+        "plain text with 'single' and \"double\" quotes, a backslash \\ and a newline\n",
+        "{{literal braces}} around {name} and {{{count}}}",
+        "Total: ${total:,.2f} | Count: {count:>5} | Repr: {name!r} | Ascii: {note!a}",
+        "{note} is substituted verbatim, {{name}} is not",
+        "keyword field {class} and ''' quotes in text",
+        "{name:*^30}{count:03d}{total:.1e}{count}",
+        "",
+        "attribute {name.upper} falls back",
+    ]
+    for template in templates:
+        assert compile_template(template)(**values) == template.format(**values), template
+    assert compile_template("positional {} falls back")('a') == "positional a falls back"
+
+def test_backup_includes_uncheckpointed_wal_rows(tmp_path, monkeypatch):
+    """Rows committed through a WAL connection the app keeps open are in the automation backup"""
+    import sqlite3
+    from automation_engine import TaskAutomationEngine
+
+    monkeypatch.chdir(tmp_path)
+    conn = sqlite3.connect("courier_data.db")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA wal_autocheckpoint=0")
+    conn.execute("CREATE TABLE deliveries (id INTEGER PRIMARY KEY, address TEXT)")
+    with conn:
+        conn.executemany("INSERT INTO deliveries (address) VALUES (?)", [(f"{i} Main St",) for i in range(500)])
+    assert os.path.getsize("courier_data.db-wal") > 0
+
+    automation = TaskAutomationEngine("courier_data.db")
+    now = datetime(2026, 1, 2, 3, 4, 5)
+    automation._auto_backup_data(now)
+    automation.shutdown()
+
+    backup = sqlite3.connect("backup_courier_data_20260102_030405.db")
+    assert backup.execute("SELECT COUNT(*) FROM deliveries").fetchone() == (500,)
+    assert backup.execute("SELECT address FROM deliveries WHERE id = 500").fetchone() == ("499 Main St",)
+    backup.close()
+    conn.close()
+
+def test_time_based_rule_fires_once_per_day():
+    """A time-based rule skips the crossing before startup and then fires once per day"""
+    from automation_engine import TaskAutomationEngine
+
+    automation = TaskAutomationEngine("test_time_rule.db")
+    automation.add_automation_rule("nightly", {"type": "time_based", "time": "00:00"}, {"type": "send_notification", "message": "tick"})
+    check = automation.automation_rules[0]['check']
+    automation.shutdown()
+
+    fired = [check([], None, datetime(2026, 1, 1, hour, minute)) for hour, minute in [(9, 0), (12, 0), (23, 59)]]
+    assert fired == [False, False, False]
+    assert check([], None, datetime(2026, 1, 2, 0, 0))
+    assert not check([], None, datetime(2026, 1, 2, 0, 1))
+    assert not check([], None, datetime(2026, 1, 2, 23, 59))
+    assert check([], None, datetime(2026, 1, 3, 8, 30))
+    assert not check([], None, datetime(2026, 1, 3, 8, 31))
+
+def test_bulk_assign_priority_exact_matches_in_chunks(tmp_path):
+    """Priorities are written to exactly the listed addresses, across several IN chunks, leaving status alone"""
+    from automation_engine import BatchOperationManager, SQL_IN_CHUNK
+
+    batch_mgr = BatchOperationManager(str(tmp_path / "test_priority.db"))
+    count = 3 * SQL_IN_CHUNK
+    rows = [(f"{i} Main St", 'completed' if i % 3 == 0 else 'pending') for i in range(count)]
+    with batch_mgr._conn:
+        batch_mgr._conn.executemany("INSERT INTO deliveries (address, status) VALUES (?, ?)", rows)
+
+    # Every address but each fifth, spread over three chunks, plus near misses that must not match anything
+    targets = [f"{i} Main St" for i in range(count) if i % 5] + ["1 Main", "Main St", "%", "3 main st"]
+    assert len(targets) > 2 * SQL_IN_CHUNK
+    batch_mgr.bulk_assign_priority(iter(targets), "Urgent")
+
+    result = dict(batch_mgr._conn.execute("SELECT address, priority FROM deliveries"))
+    assert result == {f"{i} Main St": 'Urgent' if i % 5 else 'Normal' for i in range(count)}
+    assert batch_mgr._conn.execute("SELECT address, status FROM deliveries ORDER BY id").fetchall() == rows
+    batch_mgr.close()
+
+def test_import_stops_from_csv_matches_dictreader(tmp_path):
+    """Positional CSV import builds the same stops as the original DictReader loop, with optional columns missing"""
+    import csv
+    from dataclasses import asdict
+    from automation_engine import BatchOperationManager, DeliveryStop
+
+    def dictreader_import(filename):
+        with open(filename, 'r', encoding='utf-8') as csvfile:
+            return [DeliveryStop(
+                id=int(row.get('id', 0)),
+                address=row['address'],
+                priority=row.get('priority', 'Normal'),
+                delivery_type=row.get('delivery_type', 'Standard'),
+                load_size=float(row['load_size']),
+                estimated_time=int(row.get('estimated_time', 15)),
+                customer_name=row.get('customer_name'),
+                customer_phone=row.get('customer_phone'),
+                special_instructions=row.get('special_instructions')
+            ) for row in csv.DictReader(csvfile)]
+
+    files = {
+        "reordered.csv": "load_size,notes,address,id,customer_name,estimated_time\n"
+                         "2.5,fragile,\"1 Main St, Downtown\",7,ABC Corp,20\n"
+                         "0.75,,2 Oak Ave,8,,5\n",
+        "required_only.csv": "address,load_size\n3 Pine Rd,4\n4 Elm St,1.25\n",
+        "all_columns.csv": "id,address,priority,delivery_type,load_size,estimated_time,customer_name,customer_phone,special_instructions\n"
+                           "9,5 Birch Ln,Urgent,Express,3.0,12,XYZ Ltd,555-0123,Ring twice\n",
+        "header_only.csv": "address,load_size\n",
+    }
+    batch_mgr = BatchOperationManager(str(tmp_path / "test_import.db"))
+    for name, text in files.items():
+        path = tmp_path / name
+        path.write_text(text, encoding='utf-8')
+        imported = batch_mgr.import_stops_from_csv(str(path))
+        expected = dictreader_import(str(path))
+        assert len(imported) == len(expected), name
+        for got, want in zip(imported, expected):
+            got, want = asdict(got), asdict(want)
+            del got['created_at'], want['created_at']
+            assert got == want, name
+    batch_mgr.close()
+
+def test_export_to_json_round_trip(tmp_path):
+    """Streamed JSON exports load back with every stop field, and iterators need total_stops"""
+    import pytest
+    from dataclasses import asdict
+    from automation_engine import ContentCreationEngine, DeliveryStop
+
+    stops = [
+        DeliveryStop(id=1, address="123 Main Street, Downtown", priority="Urgent", delivery_type="Express",
+                     load_size=3.5, estimated_time=20, customer_name="Café \"Zoë\"", customer_phone="555-0123",
+                     special_instructions="Ring twice\nthen wait", coordinates="51.50000,-0.12000", weather_temp=-1.5),
+        DeliveryStop(id=2, address="456 Oak Avenue", priority="Normal", delivery_type="Standard",
+                     load_size=2.0, estimated_time=15, status="completed", completed_at="2026-01-02T10:00:00"),
+    ]
+    content = ContentCreationEngine(str(tmp_path / "test_content.db"))
+
+    for name, items, total in [("list.json", stops, None), ("iter.json", iter(stops), 2), ("empty.json", [], None)]:
+        path = str(tmp_path / name)
+        assert content.export_to_json(items, path, total) == path
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        expected = stops if name != "empty.json" else []
+        assert data['total_stops'] == len(expected)
+        datetime.fromisoformat(data['export_date'])
+        # Delivery windows have never been part of the export
+        assert data['stops'] == [{key: value for key, value in asdict(stop).items() if not key.startswith('delivery_window')}
+                                 for stop in expected]
+
+    with pytest.raises(TypeError):
+        content.export_to_json(iter(stops), str(tmp_path / "missing_total.json"))
+    assert not os.path.exists(tmp_path / "missing_total.json")
+
 if __name__ == "__main__":
     success = test_backend_features()
     